@@ -9,19 +9,1617 @@ import sys
 import zipfile
 import shutil
 import threading
+import queue
 import subprocess
 import platform
+import time
+import socket
+import argparse
+import random
+import tempfile
+import zlib
+import heapq
+import struct
+from array import array
+import hashlib
+import json
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+from urllib.parse import urlsplit
 from pathlib import Path
 from tkinter import Tk, Label, Button, Frame, Listbox, Scrollbar, StringVar, Radiobutton, Toplevel, Checkbutton, BooleanVar
+from tkinter import IntVar, Spinbox, TclError, Entry
 from tkinter import filedialog, messagebox, ttk
 from tkinter.constants import *
 
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
 try:
     from tkinterdnd2 import DND_FILES, TkinterDnD
     HAS_DND = True
 except ImportError:
     HAS_DND = False
-    print("提示: 安裝 tkinterdnd2 以啟用拖放功能: pip install tkinterdnd2")
+    print("提示: 安裝 tkinterdnd2 以啟用拖放功能: pip install tkinterdnd2", file=sys.stderr)
+
+try:
+    import xxhash
+    HAS_XXHASH = True
+except ImportError:
+    HAS_XXHASH = False
+
+# Number of files handed from the folder walker to the archive writer at a time
+WALK_BATCH_SIZE = 1024
+
+# Read size used when copying file contents into an archive
+COPY_BUFFER_SIZE = 1024 * 1024
+
+
+def iter_folder_files(folder_path, batch_size=WALK_BATCH_SIZE, follow_symlinks=False, onerror=None):
+    """
+    Walk a folder with os.scandir and yield batches of files to archive
+
+    Each batch is a list of (path, arcname, stat_result) tuples. Archive names
+    are relative to the folder's parent (so they start with the folder name)
+    and always use '/' as separator. The DirEntry type information is reused,
+    so every file costs a single stat call and no Path objects are created.
+
+    Args:
+        folder_path: Folder to walk
+        batch_size: Maximum number of files per yielded batch
+        follow_symlinks: Descend into symlinked directories. Directories that
+            were already visited (symlink loops) are skipped.
+        onerror: Called with the OSError for every directory or entry that
+            cannot be read. If None, the error is raised.
+    """
+    root = os.fspath(folder_path)
+    prefix = os.path.basename(os.path.normpath(root)) + '/'
+
+    def handle_error(error):
+        if onerror is None:
+            raise error
+        onerror(error)
+
+    visited = set()
+    if follow_symlinks:
+        root_stat = os.stat(root)
+        visited.add((root_stat.st_dev, root_stat.st_ino))
+
+    batch = []
+    stack = [(root, prefix)]
+    while stack:
+        dir_path, arc_prefix = stack.pop()
+        try:
+            with os.scandir(dir_path) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=follow_symlinks):
+                            if follow_symlinks:
+                                # DirEntry.stat() has no inode on Windows, so stat the path
+                                dir_stat = os.stat(entry.path)
+                                key = (dir_stat.st_dev, dir_stat.st_ino)
+                                if key in visited:
+                                    continue
+                                visited.add(key)
+                            stack.append((entry.path, arc_prefix + entry.name + '/'))
+                        elif entry.is_file():
+                            batch.append((entry.path, arc_prefix + entry.name, entry.stat()))
+                            if len(batch) >= batch_size:
+                                yield batch
+                                batch = []
+                    except OSError as e:
+                        handle_error(e)
+        except OSError as e:
+            handle_error(e)
+
+    if batch:
+        yield batch
+
+
+def _zipinfo_from_stat(arcname, st, compress_type=zipfile.ZIP_DEFLATED):
+    """Build a ZipInfo from an existing stat result, like ZipInfo.from_file does"""
+    zinfo = zipfile.ZipInfo(arcname, time.localtime(st.st_mtime)[0:6])
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    zinfo.file_size = st.st_size
+    zinfo.compress_type = compress_type
+    return zinfo
+
+
+# ZipInfo attribute holding the per-entry level (private before Python 3.13)
+_ZIPINFO_LEVEL_ATTR = 'compress_level' if hasattr(zipfile.ZipInfo, 'compress_level') else '_compresslevel'
+
+
+def _file_type(arcname):
+    """Lower-case extension used to group files by type"""
+    return os.path.splitext(arcname)[1].lower() or '(無副檔名)'
+
+
+# Sizes from which a zip entry needs ZIP64 fields
+ZIP64_LIMIT = 0xFFFFFFFF
+ZIP64_COUNT_LIMIT = 0xFFFF
+
+# Entry names kept in memory before CompactZipWriter spills them to disk
+COMPACT_NAMES_IN_MEMORY = 16 * 1024 * 1024
+
+
+class CompactZipWriter:
+    """
+    Sequential ZIP64 writer that keeps only a few dozen bytes per entry
+
+    zipfile.ZipFile holds a ZipInfo object per member until close, which
+    costs several GB for millions of files. This writer streams every member
+    with a data descriptor (so it never seeks and works on any ZipSink) and
+    records what the central directory needs in typed arrays: offset and
+    sizes (3 x 8 bytes), CRC, DOS time and attributes (3 x 4 bytes), method
+    and flags (1 + 2 bytes) and the name length (2 bytes). Names go to a
+    spooled temporary file that moves to disk once it gets large. close()
+    streams the central directory out of these structures.
+    """
+
+    def __init__(self, output):
+        if hasattr(output, 'write'):
+            self.fp = output
+            self._own_fp = False
+        else:
+            self.fp = open(output, 'wb')
+            self._own_fp = True
+        self.offset = 0
+        self._offsets = array('Q')
+        self._compressed = array('Q')
+        self._sizes = array('Q')
+        self._crcs = array('I')
+        self._times = array('I')
+        self._attrs = array('I')
+        self._methods = array('B')
+        self._flags = array('H')
+        self._name_lengths = array('H')
+        self._names = tempfile.SpooledTemporaryFile(max_size=COMPACT_NAMES_IN_MEMORY)
+        self._system = 0 if sys.platform == 'win32' else 3
+
+    def __len__(self):
+        return len(self._offsets)
+
+    def _write(self, data):
+        self.fp.write(data)
+        self.offset += len(data)
+
+    @staticmethod
+    def _dos_time(mtime):
+        t = time.localtime(mtime)
+        if t.tm_year < 1980:
+            raise ValueError('ZIP does not support timestamps before 1980')
+        date = (t.tm_year - 1980) << 9 | t.tm_mon << 5 | t.tm_mday
+        clock = t.tm_hour << 11 | t.tm_min << 5 | t.tm_sec // 2
+        return date << 16 | clock
+
+    def write_file(self, file_path, arcname, st, level=None, hasher=None):
+        """
+        Append one file, deflated at `level` (0 stores it uncompressed)
+
+        If a ManifestHasher is given, it is fed the same chunks that are
+        compressed.
+
+        Returns:
+            (compressed size, uncompressed size)
+        """
+        if level is None:
+            level = BUILTIN_LEVEL
+        name = arcname.encode('utf-8')
+        flags = 0x08 | (0x800 if not name.isascii() else 0)
+        method = zipfile.ZIP_STORED if level == 0 else zipfile.ZIP_DEFLATED
+        dos_time = self._dos_time(st.st_mtime)
+        # Same headroom zipfile uses for files that might grow while being read
+        zip64 = st.st_size * 1.05 > ZIP64_LIMIT
+
+        header_offset = self.offset
+        if zip64:
+            extra = struct.pack('<HHQQ', 1, 16, 0, 0)
+            sizes = (ZIP64_LIMIT, ZIP64_LIMIT)
+        else:
+            extra = b''
+            sizes = (0, 0)
+        self._write(struct.pack(
+            '<IHHHHHIIIHH', 0x04034b50, 45 if zip64 else 20, flags, method,
+            dos_time & 0xFFFF, dos_time >> 16, 0, sizes[0], sizes[1], len(name), len(extra)
+        ) + name + extra)
+
+        crc = 0
+        size = 0
+        compressed = 0
+        compressor = zlib.compressobj(level, zlib.DEFLATED, -15) if method == zipfile.ZIP_DEFLATED else None
+        with open(file_path, 'rb') as src:
+            while True:
+                chunk = src.read(COPY_BUFFER_SIZE)
+                if not chunk:
+                    break
+                crc = zlib.crc32(chunk, crc)
+                size += len(chunk)
+                if hasher is not None:
+                    hasher.update(chunk)
+                if compressor is not None:
+                    chunk = compressor.compress(chunk)
+                compressed += len(chunk)
+                self._write(chunk)
+        if compressor is not None:
+            tail = compressor.flush()
+            compressed += len(tail)
+            self._write(tail)
+        if hasher is not None:
+            hasher.finish(arcname)
+
+        if not zip64 and (size > ZIP64_LIMIT or compressed > ZIP64_LIMIT):
+            raise RuntimeError(f"{arcname}: 檔案在壓縮時變大，超過 ZIP64 上限")
+        if zip64:
+            self._write(struct.pack('<IIQQ', 0x08074b50, crc, compressed, size))
+        else:
+            self._write(struct.pack('<IIII', 0x08074b50, crc, compressed, size))
+
+        self._offsets.append(header_offset)
+        self._compressed.append(compressed)
+        self._sizes.append(size)
+        self._crcs.append(crc)
+        self._times.append(dos_time)
+        self._attrs.append((st.st_mode & 0xFFFF) << 16)
+        self._methods.append(method)
+        self._flags.append(flags)
+        self._name_lengths.append(len(name))
+        self._names.write(name)
+        return compressed, size
+
+    def close(self):
+        """Stream the central directory and end records, then release the bookkeeping"""
+        try:
+            cd_offset = self.offset
+            self._names.seek(0)
+            for i in range(len(self._offsets)):
+                name = self._names.read(self._name_lengths[i])
+                size = self._sizes[i]
+                compressed = self._compressed[i]
+                header_offset = self._offsets[i]
+
+                zip64_fields = []
+                if size >= ZIP64_LIMIT:
+                    zip64_fields.append(size)
+                    size = ZIP64_LIMIT
+                if compressed >= ZIP64_LIMIT:
+                    zip64_fields.append(compressed)
+                    compressed = ZIP64_LIMIT
+                if header_offset >= ZIP64_LIMIT:
+                    zip64_fields.append(header_offset)
+                    header_offset = ZIP64_LIMIT
+                if zip64_fields:
+                    extra = struct.pack(f'<HH{len(zip64_fields)}Q', 1, 8 * len(zip64_fields), *zip64_fields)
+                    version = 45
+                else:
+                    extra = b''
+                    version = 20
+
+                dos_time = self._times[i]
+                self._write(struct.pack(
+                    '<IHHHHHHIIIHHHHHII', 0x02014b50, self._system << 8 | version, version,
+                    self._flags[i], self._methods[i], dos_time & 0xFFFF, dos_time >> 16,
+                    self._crcs[i], compressed, size, len(name), len(extra), 0, 0, 0,
+                    self._attrs[i], header_offset
+                ) + name + extra)
+
+            count = len(self._offsets)
+            cd_size = self.offset - cd_offset
+            if count >= ZIP64_COUNT_LIMIT or cd_size >= ZIP64_LIMIT or cd_offset >= ZIP64_LIMIT:
+                zip64_end_offset = self.offset
+                self._write(struct.pack('<IQHHIIQQQQ', 0x06064b50, 44, 45, 45, 0, 0,
+                                        count, count, cd_size, cd_offset))
+                self._write(struct.pack('<IIQI', 0x07064b50, 0, zip64_end_offset, 1))
+            self._write(struct.pack(
+                '<IHHHHIIH', 0x06054b50, 0, 0, min(count, ZIP64_COUNT_LIMIT), min(count, ZIP64_COUNT_LIMIT),
+                min(cd_size, ZIP64_LIMIT), min(cd_offset, ZIP64_LIMIT), 0
+            ))
+            self.fp.flush()
+        finally:
+            self._names.close()
+            if self._own_fp:
+                self.fp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._names.close()
+            if self._own_fp:
+                self.fp.close()
+
+
+def _copy_into(src, dest, arcname, hasher):
+    """Copy a file into an archive member, feeding the same chunks to the hasher"""
+    if hasher is None:
+        shutil.copyfileobj(src, dest, COPY_BUFFER_SIZE)
+        return
+    while True:
+        chunk = src.read(COPY_BUFFER_SIZE)
+        if not chunk:
+            break
+        dest.write(chunk)
+        hasher.update(chunk)
+    hasher.finish(arcname)
+
+
+def write_builtin_zip(folder_path, output, controller=None, compact=False, hasher=None):
+    """
+    Zip a folder with Python's zipfile module
+
+    Args:
+        folder_path: Path to the folder to zip
+        output: Path of the zip file, or a writable file-like object/ZipSink.
+            Non-seekable outputs get data descriptors instead of patched headers.
+        controller: Optional AdaptiveLevelController that picks the level of
+            every file from its type and is fed the measured rate and ratio
+        compact: Write with CompactZipWriter, for folders with millions of files
+        hasher: Optional ManifestHasher fed with every file's contents
+    """
+    if compact:
+        with CompactZipWriter(output) as writer:
+            for batch in iter_folder_files(folder_path):
+                for file_path, arcname, st in batch:
+                    if controller is None:
+                        writer.write_file(file_path, arcname, st, hasher=hasher)
+                        continue
+                    file_type = _file_type(arcname)
+                    level = controller.level(file_type)
+                    start = time.perf_counter()
+                    compressed, size = writer.write_file(file_path, arcname, st, level, hasher)
+                    controller.record(file_type, level, size, compressed, time.perf_counter() - start)
+        return True
+
+    with zipfile.ZipFile(output, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for batch in iter_folder_files(folder_path):
+            for file_path, arcname, st in batch:
+                if controller is None:
+                    zinfo = _zipinfo_from_stat(arcname, st)
+                    with open(file_path, 'rb') as src, zipf.open(zinfo, 'w') as dest:
+                        _copy_into(src, dest, arcname, hasher)
+                    continue
+
+                file_type = _file_type(arcname)
+                level = controller.level(file_type)
+                if level == 0:
+                    zinfo = _zipinfo_from_stat(arcname, st, zipfile.ZIP_STORED)
+                else:
+                    zinfo = _zipinfo_from_stat(arcname, st)
+                    # Per-entry level; ZipFile.open() reads it from the ZipInfo
+                    setattr(zinfo, _ZIPINFO_LEVEL_ATTR, level)
+                start = time.perf_counter()
+                with open(file_path, 'rb') as src, zipf.open(zinfo, 'w') as dest:
+                    _copy_into(src, dest, arcname, hasher)
+                controller.record(file_type, level, zinfo.file_size, zinfo.compress_size,
+                                  time.perf_counter() - start)
+    return True
+
+
+# Checksum algorithms a manifest can use (xxh3_64 needs the optional xxhash package)
+MANIFEST_ALGORITHMS = ('sha256', 'blake2b') + (('xxh3_64',) if HAS_XXHASH else ())
+
+# Chunks waiting for the hashing thread; bounds memory if hashing falls behind
+MANIFEST_QUEUE_SIZE = 64
+
+
+def _new_hash(algorithm):
+    if algorithm == 'xxh3_64':
+        return xxhash.xxh3_64()
+    return hashlib.new(algorithm)
+
+
+# Manifest records kept in memory before they spill to disk
+MANIFEST_ENTRIES_IN_MEMORY = 16 * 1024 * 1024
+
+
+class ManifestEntries:
+    """
+    (arcname, digest) pairs spooled to a temporary file in the order added
+
+    A list of tuples costs a few hundred bytes per file, several GB for
+    millions of files. Records are length-prefixed UTF-8 in a spooled
+    temporary file that moves to disk once it gets large, and are read back
+    in the same (walk) order, so nothing needs sorting in memory.
+    """
+
+    def __init__(self):
+        self._file = tempfile.SpooledTemporaryFile(max_size=MANIFEST_ENTRIES_IN_MEMORY)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, arcname, digest):
+        name = arcname.encode('utf-8')
+        digest = digest.encode('ascii')
+        self._file.write(struct.pack('<IH', len(name), len(digest)) + name + digest)
+        self._count += 1
+
+    def __iter__(self):
+        self._file.seek(0)
+        for _ in range(self._count):
+            name_length, digest_length = struct.unpack('<IH', self._file.read(6))
+            name = self._file.read(name_length).decode('utf-8')
+            yield name, self._file.read(digest_length).decode('ascii')
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class ManifestHasher:
+    """
+    Hash archived files on a background thread, from the writer's own chunks
+
+    The writer calls update() with every chunk it reads and finish() after
+    each file. Chunks are handed over through a bounded queue, so hashing
+    runs alongside compression (hashlib, xxhash and zlib release the GIL)
+    without reading any file twice. close() returns the ManifestEntries.
+    """
+
+    def __init__(self, algorithm='sha256'):
+        self.algorithm = algorithm
+        self.entries = ManifestEntries()
+        self._error = None
+        self._queue = queue.Queue(maxsize=MANIFEST_QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        current = None
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            try:
+                chunk, arcname = item
+                if current is None:
+                    current = _new_hash(self.algorithm)
+                if chunk:
+                    current.update(chunk)
+                if arcname is not None:
+                    self.entries.append(arcname, current.hexdigest())
+                    current = None
+            except Exception as e:
+                self._error = e
+
+    def update(self, chunk):
+        self._queue.put((chunk, None))
+
+    def finish(self, arcname):
+        self._queue.put((b'', arcname))
+
+    def close(self):
+        """Wait for the hashing thread and return the digests"""
+        self._queue.put(None)
+        self._thread.join()
+        if self._error is not None:
+            self.entries.close()
+            raise self._error
+        return self.entries
+
+    def abort(self):
+        """Stop the hashing thread and drop the digests without raising"""
+        self._queue.put(None)
+        self._thread.join()
+        self.entries.close()
+
+
+def manifest_path(archive_path, algorithm='sha256', as_json=False):
+    """Sidecar manifest path: folder.zip.sha256, or folder.zip.sha256.json"""
+    return f"{archive_path}.{algorithm}" + ('.json' if as_json else '')
+
+
+def write_manifest(archive_path, entries, algorithm='sha256', as_json=False):
+    """
+    Atomically write the checksum manifest next to an archive
+
+    The text format matches sha256sum/b2sum output ("digest  name"), so it
+    can be checked after extraction; JSON maps each name to its digest.
+    Entries are written as they are iterated (walk order for ManifestEntries).
+    """
+    target = manifest_path(archive_path, algorithm, as_json)
+    tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8', newline='\n') as f:
+            if as_json:
+                # Same layout as json.dump(..., indent=1), one file at a time
+                f.write('{\n "archive": %s,\n "algorithm": %s,\n "files": {' % (
+                    json.dumps(os.path.basename(archive_path), ensure_ascii=False), json.dumps(algorithm)))
+                separator = '\n  '
+                for arcname, digest in entries:
+                    f.write(f"{separator}{json.dumps(arcname, ensure_ascii=False)}: {json.dumps(digest)}")
+                    separator = ',\n  '
+                f.write('}\n}' if separator == '\n  ' else '\n }\n}')
+            else:
+                for arcname, digest in entries:
+                    f.write(f"{digest}  {arcname}\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, target)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return target
+
+
+def hash_folder_manifest(folder_path, archive_path, algorithm='sha256', as_json=False):
+    """Hash a folder from disk and write its manifest (used after 7-Zip, which hides its reads)"""
+    with ManifestEntries() as entries:
+        for batch in iter_folder_files(folder_path):
+            for file_path, arcname, _ in batch:
+                digest = _new_hash(algorithm)
+                with open(file_path, 'rb') as f:
+                    while True:
+                        chunk = f.read(COPY_BUFFER_SIZE)
+                        if not chunk:
+                            break
+                        digest.update(chunk)
+                entries.append(arcname, digest.hexdigest())
+        return write_manifest(archive_path, entries, algorithm, as_json)
+
+
+# Bytes collected before a sink sends them on (zipfile writes headers in tiny pieces)
+SINK_BUFFER_SIZE = 256 * 1024
+
+
+class ZipSink:
+    """
+    Write-only, non-seekable destination an archive can be streamed into
+
+    Because a sink has no tell()/seek(), zipfile writes each member followed
+    by a data descriptor and never goes back to patch sizes. Subclasses
+    implement _send() and optionally _finish()/_abort(). Used as a context
+    manager, the sink is finished on success and aborted on error, so a
+    receiver never sees a truncated archive as complete.
+    """
+
+    def __init__(self):
+        self._buffer = bytearray()
+        self.closed = False
+
+    def write(self, data):
+        self._buffer += data
+        if len(self._buffer) >= SINK_BUFFER_SIZE:
+            self.flush()
+        return len(data)
+
+    def flush(self):
+        if self._buffer:
+            self._send(bytes(self._buffer))
+            self._buffer.clear()
+
+    def close(self):
+        """Send any buffered data and complete the transfer"""
+        if not self.closed:
+            self.closed = True
+            self.flush()
+            self._finish()
+
+    def abort(self):
+        """Drop the transfer without completing it"""
+        if not self.closed:
+            self.closed = True
+            self._buffer.clear()
+            self._abort()
+
+    def _send(self, data):
+        raise NotImplementedError
+
+    def _finish(self):
+        pass
+
+    def _abort(self):
+        self._finish()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class FileObjectSink(ZipSink):
+    """Stream into any binary file-like object (a pipe, sys.stdout.buffer, ...)"""
+
+    def __init__(self, fileobj, close_fileobj=False):
+        super().__init__()
+        self.fileobj = fileobj
+        self.close_fileobj = close_fileobj
+
+    def _send(self, data):
+        self.fileobj.write(data)
+
+    def _finish(self):
+        self.fileobj.flush()
+        if self.close_fileobj:
+            self.fileobj.close()
+
+    def _abort(self):
+        if self.close_fileobj:
+            self.fileobj.close()
+
+
+class UnixSocketSink(ZipSink):
+    """Stream to a Unix domain socket; the write side is shut down at the end"""
+
+    def __init__(self, path):
+        super().__init__()
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("此系統不支援 Unix socket")
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            self.sock.connect(path)
+        except OSError:
+            self.sock.close()
+            raise
+
+    def _send(self, data):
+        self.sock.sendall(data)
+
+    def _finish(self):
+        try:
+            self.sock.shutdown(socket.SHUT_WR)
+        finally:
+            self.sock.close()
+
+    def _abort(self):
+        self.sock.close()
+
+
+class HttpPutSink(ZipSink):
+    """Upload with a chunked HTTP PUT; a non-2xx response raises OSError on close"""
+
+    def __init__(self, url, headers=None, timeout=60):
+        super().__init__()
+        self.url = url
+        parts = urlsplit(url)
+        connection_class = http.client.HTTPSConnection if parts.scheme == 'https' else http.client.HTTPConnection
+        self.conn = connection_class(parts.hostname, parts.port, timeout=timeout)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        self.conn.putrequest('PUT', path)
+        self.conn.putheader('Content-Type', 'application/zip')
+        self.conn.putheader('Transfer-Encoding', 'chunked')
+        for name, value in (headers or {}).items():
+            self.conn.putheader(name, value)
+        self.conn.endheaders()
+
+    def _send(self, data):
+        self.conn.send(b'%X\r\n' % len(data))
+        self.conn.send(data)
+        self.conn.send(b'\r\n')
+
+    def _finish(self):
+        try:
+            self.conn.send(b'0\r\n\r\n')
+            response = self.conn.getresponse()
+            response.read()
+            if not 200 <= response.status < 300:
+                raise OSError(f"HTTP PUT {self.url} 失敗: {response.status} {response.reason}")
+        finally:
+            self.conn.close()
+
+    def _abort(self):
+        self.conn.close()
+
+
+def open_sink(target):
+    """
+    Open a ZipSink for a stream target, or return None for a local file path
+
+    Supported targets:
+        file-like object     anything with a write() method
+        '-'                  standard output
+        'unix:/path/sock'    Unix domain socket
+        'http(s)://...'      chunked HTTP PUT
+    """
+    if isinstance(target, ZipSink):
+        return target
+    if hasattr(target, 'write'):
+        return FileObjectSink(target)
+    if not isinstance(target, str):
+        return None
+    if target == '-':
+        return FileObjectSink(sys.stdout.buffer)
+    if target.startswith('unix:'):
+        return UnixSocketSink(target[len('unix:'):])
+    if target.startswith(('http://', 'https://')):
+        return HttpPutSink(target)
+    return None
+
+
+def find_7zip():
+    """Find 7zip executable on the system"""
+    system = platform.system()
+    possible_paths = []
+
+    if system == 'Windows':
+        possible_paths = [
+            r'C:\Program Files\7-Zip\7z.exe',
+            r'C:\Program Files (x86)\7-Zip\7z.exe',
+        ]
+    elif system == 'Darwin':  # macOS
+        possible_paths = [
+            '/usr/local/bin/7z',
+            '/opt/homebrew/bin/7z',
+            '/usr/bin/7z',
+        ]
+    else:  # Linux
+        possible_paths = [
+            '/usr/bin/7z',
+            '/usr/local/bin/7z',
+        ]
+
+    # Check each path
+    for path in possible_paths:
+        if os.path.exists(path):
+            return path
+
+    # Try to find in PATH
+    try:
+        result = subprocess.run(['which', '7z'], capture_output=True, text=True)
+        if result.returncode == 0:
+            return result.stdout.strip()
+    except:
+        pass
+
+    return None
+
+
+# Compression level used by each backend (zipfile uses zlib's default level)
+BUILTIN_LEVEL = 6
+SEVENZIP_LEVEL = 9
+
+# Levels the adaptive mode moves between (0 = store without compression)
+BUILTIN_LEVELS = (0, 1, 2, 3, 4, 5, 6, 7, 8, 9)
+SEVENZIP_LEVELS = (1, 3, 5, 7, 9)
+
+# Input bytes of one file type between two adaptive level adjustments
+ADAPTIVE_WINDOW_BYTES = 8 * 1024 * 1024
+
+# File types that deflate worse than this are stored instead
+ADAPTIVE_STORE_RATIO = 0.97
+
+
+def parse_adaptive_target(text, now=None):
+    """
+    Parse an adaptive target: a rate in MB/s ("50") or a deadline ("06:30")
+
+    A deadline that already passed today means tomorrow.
+
+    Returns:
+        (bytes per second, None) or (None, deadline as a time.time() value)
+    """
+    text = text.strip()
+    if ':' not in text:
+        rate = float(text)
+        if rate <= 0:
+            raise ValueError(text)
+        return rate * 1024 * 1024, None
+
+    hours, minutes = (int(part) for part in text.split(':', 1))
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(text)
+    now = time.time() if now is None else now
+    local = time.localtime(now)
+    deadline = time.mktime((local.tm_year, local.tm_mon, local.tm_mday, hours, minutes, 0, 0, 0, -1))
+    if deadline <= now:
+        deadline += 24 * 60 * 60
+    return None, deadline
+
+
+class AdaptiveLevelController:
+    """
+    Pick compression levels that keep a batch on a throughput target
+
+    The target is a rate for the whole batch, or a deadline from which the
+    rate still needed is derived from the bytes left (see add_work() and
+    finish_work(), which takes a job's bytes back out whether it was
+    archived, skipped, failed or cancelled). Rate
+    and ratio are measured per key: a file type for the builtin writer, '*'
+    (whole folders) for 7-Zip. Every ADAPTIVE_WINDOW_BYTES a key's level
+    moves one step down if it runs slower than its worker's share of the
+    target, or one step up if it is well ahead and the next level is not
+    known to compress worse. Incompressible file types are stored.
+    """
+
+    def __init__(self, levels, start_level, rate=None, deadline=None, workers=1):
+        self.levels = levels
+        self.start_level = start_level
+        self.rate = rate
+        self.deadline = deadline
+        self.workers = max(1, workers)
+        # Kept apart because queued folders are measured on a background
+        # walk that can finish after their first files were compressed
+        self.queued_bytes = 0
+        self.done_bytes = 0
+        self._queued_by_job = {}
+        self._done_by_job = {}
+        self._running = {}  # worker thread id -> job it is compressing
+        self._finished = set()
+        self._lock = threading.Lock()
+        self._levels = {}
+        self._window = {}
+        self._stats = {}
+
+    def add_work(self, num_bytes, job=None):
+        """Account for input of a job that still has to be compressed (deadline mode)"""
+        with self._lock:
+            if job is not None:
+                if job in self._finished:
+                    # The size walk lost the race with the job itself
+                    return
+                self._queued_by_job[job] = self._queued_by_job.get(job, 0) + num_bytes
+            self.queued_bytes += num_bytes
+
+    def start_work(self, job):
+        """Attribute the calling thread's record() calls to a job until finish_work()"""
+        with self._lock:
+            self._running[threading.get_ident()] = job
+
+    def finish_work(self, job):
+        """Take a job that was archived, skipped, failed or cancelled out of the remaining bytes"""
+        with self._lock:
+            self._finished.add(job)
+            self.queued_bytes -= self._queued_by_job.pop(job, 0)
+            self.done_bytes -= self._done_by_job.pop(job, 0)
+            for ident in [ident for ident, running in self._running.items() if running is job]:
+                del self._running[ident]
+
+    @property
+    def remaining_bytes(self):
+        """Input bytes queued but not compressed yet"""
+        return max(0, self.queued_bytes - self.done_bytes)
+
+    def target_rate(self):
+        """Bytes per second each worker should reach, or None if there is no target"""
+        if self.rate is not None:
+            return self.rate / self.workers
+        if self.deadline is None:
+            return None
+        seconds_left = self.deadline - time.time()
+        if seconds_left <= 0:
+            return float('inf')
+        return self.remaining_bytes / seconds_left / self.workers
+
+    def level(self, key):
+        """Current level for a key"""
+        with self._lock:
+            return self._levels.get(key, self.start_level)
+
+    def ratio(self, key, level):
+        """Measured compressed/input ratio of a key at a level, or None"""
+        stats = self._stats.get((key, level))
+        return stats[1] / stats[0] if stats and stats[0] else None
+
+    def record(self, key, level, in_bytes, out_bytes, seconds):
+        """Feed one measurement and adjust the key's level once its window is full"""
+        with self._lock:
+            self.done_bytes += in_bytes
+            job = self._running.get(threading.get_ident())
+            if job is not None:
+                self._done_by_job[job] = self._done_by_job.get(job, 0) + in_bytes
+            stats = self._stats.setdefault((key, level), [0, 0, 0.0])
+            stats[0] += in_bytes
+            stats[1] += out_bytes
+            stats[2] += seconds
+
+            window = self._window.setdefault(key, [0, 0, 0.0])
+            window[0] += in_bytes
+            window[1] += out_bytes
+            window[2] += seconds
+            if window[0] < ADAPTIVE_WINDOW_BYTES:
+                return
+            self._window[key] = [0, 0, 0.0]
+
+            current = self._levels.get(key, self.start_level)
+            if level != current:
+                # Measured at a level this key has already moved away from
+                return
+            measured_rate = window[0] / window[2] if window[2] else float('inf')
+            measured_ratio = window[1] / window[0]
+
+            if 0 in self.levels and level != 0 and measured_ratio > ADAPTIVE_STORE_RATIO:
+                self._levels[key] = 0
+                return
+
+            target = self.target_rate()
+            if target is None:
+                return
+            position = self.levels.index(current)
+            if measured_rate < target * 0.9 and position > 0:
+                lower = self.levels[position - 1]
+                # Storing only pays off as a last resort for compressible types
+                if lower != 0 or measured_rate < target * 0.5:
+                    self._levels[key] = lower
+            elif measured_rate > target * 1.25 and position < len(self.levels) - 1:
+                higher = self.levels[position + 1]
+                higher_ratio = self.ratio(key, higher)
+                if higher_ratio is None or higher_ratio < measured_ratio * 0.99:
+                    self._levels[key] = higher
+
+
+# Files trial-compressed per (folder, file type) by the estimator
+ESTIMATE_SAMPLES_PER_TYPE = 8
+
+# Bytes read from the start of each sampled file
+ESTIMATE_SAMPLE_BYTES = 256 * 1024
+
+# Files sampled across the whole batch, spread evenly over the groups
+ESTIMATE_MAX_SAMPLES = 2048
+
+# Samples handed to the 7-Zip trial, spread evenly over the file types
+ESTIMATE_SEVENZIP_SAMPLES = 256
+
+# Local header + central directory record per zip entry, excluding the name
+ZIP_ENTRY_OVERHEAD = 30 + 46
+
+
+def _format_size(num_bytes):
+    """Human readable byte count"""
+    for unit in ('B', 'KB', 'MB', 'GB', 'TB'):
+        if abs(num_bytes) < 1024 or unit == 'TB':
+            return f"{num_bytes:.1f} {unit}" if unit != 'B' else f"{int(num_bytes)} B"
+        num_bytes /= 1024
+
+
+def _format_duration(seconds):
+    """Human readable duration"""
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds} 秒"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes} 分 {seconds} 秒"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours} 小時 {minutes} 分"
+
+
+class BatchEstimate:
+    """Predicted result of a batch, filled in by estimate_batch()"""
+
+    def __init__(self):
+        self.folders = 0
+        self.files = 0
+        self.input_bytes = 0
+        self.output_bytes = 0
+        self.seconds = 0.0
+        self.workers = 1
+        self.sampled_files = 0
+        self.by_type = {}  # extension -> [files, input bytes, estimated output bytes]
+        self.disks = []    # (location, needed bytes, free bytes)
+        self.errors = []
+
+    @property
+    def fits(self):
+        """Whether every target disk has room for its archives"""
+        return all(needed <= free for _, needed, free in self.disks)
+
+    def format(self, top_types=5):
+        """Multi-line summary for the confirmation dialog and headless output"""
+        ratio = self.output_bytes / self.input_bytes * 100 if self.input_bytes else 100
+        lines = [
+            f"預估結果 (抽樣 {self.sampled_files} 個檔案):",
+            f"  檔案: {self.files:,} 個，共 {_format_size(self.input_bytes)}",
+            f"  預估壓縮後大小: {_format_size(self.output_bytes)} (約 {ratio:.0f}%)",
+            f"  預估耗時: {_format_duration(self.seconds)} ({self.workers} 個工作執行緒)",
+        ]
+        for location, needed, free in self.disks:
+            status = "✓" if needed <= free else "⚠️ 空間不足"
+            lines.append(f"  磁碟 {location}: 需要 {_format_size(needed)} / 可用 {_format_size(free)} {status}")
+        types = sorted(self.by_type.items(), key=lambda item: item[1][1], reverse=True)[:top_types]
+        if types:
+            lines.append("  主要檔案類型:")
+            for ext, (files, input_bytes, output_bytes) in types:
+                type_ratio = output_bytes / input_bytes * 100 if input_bytes else 100
+                lines.append(f"    {ext}: {files:,} 個，{_format_size(input_bytes)} → 約 {type_ratio:.0f}%")
+        if self.errors:
+            lines.append(f"  ⚠️ {len(self.errors)} 個項目無法讀取")
+        return "\n".join(lines)
+
+
+def _round_robin(strata, limit):
+    """Take items one stratum at a time until limit items are chosen"""
+    iterators = [iter(items) for items in strata]
+    chosen = []
+    while iterators and len(chosen) < limit:
+        alive = []
+        for items in iterators:
+            item = next(items, None)
+            if item is None:
+                continue
+            chosen.append(item)
+            alive.append(items)
+            if len(chosen) >= limit:
+                break
+        iterators = alive
+    return chosen
+
+
+def _deflate_size(data, level):
+    """Compressed size of data as zipfile would deflate it"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -15)
+    return len(compressor.compress(data)) + len(compressor.flush())
+
+
+class _SevenZipTrial:
+    """Samples written to a temp dir as they are read, compressed in one 7-Zip run"""
+
+    def __init__(self, sevenzip_path, level):
+        self.sevenzip_path = sevenzip_path
+        self.level = level
+        self._tmp_dir = tempfile.TemporaryDirectory(prefix='batch-zip-estimate-')
+        self._sample_dir = os.path.join(self._tmp_dir.name, 'samples')
+        os.mkdir(self._sample_dir)
+        self._keys = {}
+
+    def add(self, key, data):
+        name = f"{len(self._keys):06d}"
+        self._keys[name] = key
+        with open(os.path.join(self._sample_dir, name), 'wb') as f:
+            f.write(data)
+
+    def run(self):
+        """Compress the samples; returns ({key: compressed bytes}, seconds)"""
+        compressed = {}
+        if not self._keys:
+            return compressed, 0.0
+        archive = os.path.join(self._tmp_dir.name, 'samples.zip')
+        start = time.perf_counter()
+        subprocess.run(
+            [self.sevenzip_path, 'a', '-tzip', f'-mx={self.level}', archive, self._sample_dir],
+            capture_output=True,
+            check=True
+        )
+        seconds = time.perf_counter() - start
+        with zipfile.ZipFile(archive) as zipf:
+            for info in zipf.infolist():
+                key = self._keys.get(os.path.basename(info.filename))
+                if key is not None:
+                    compressed[key] = compressed.get(key, 0) + info.compress_size
+        return compressed, seconds
+
+    def close(self):
+        self._tmp_dir.cleanup()
+
+
+def estimate_batch(folders, sevenzip_path=None, level=None, workers=1,
+                   samples_per_type=ESTIMATE_SAMPLES_PER_TYPE,
+                   sample_bytes=ESTIMATE_SAMPLE_BYTES, max_samples=ESTIMATE_MAX_SAMPLES,
+                   seed=0):
+    """
+    Predict archive sizes and wall time of a batch without writing archives
+
+    Every folder gets a stat-only walk. Per folder and file extension a few
+    files are sampled (at most max_samples over the whole batch), the first
+    sample_bytes of each are trial-compressed with the selected backend and
+    level, and the measured ratio and read and compression rates are
+    extrapolated to the whole batch. Samples are compressed as they are read,
+    so memory use does not grow with the batch; 7-Zip trials a capped subset
+    spread over the file types.
+
+    Args:
+        folders: Folders that would be zipped
+        sevenzip_path: 7-Zip executable to trial with, or None for zipfile
+        level: Compression level, defaults to the backend's level
+        workers: Number of folders compressed at the same time
+
+    Returns:
+        BatchEstimate
+    """
+    estimate = BatchEstimate()
+    estimate.folders = len(folders)
+    estimate.workers = max(1, min(workers, len(folders)))
+    if level is None:
+        level = SEVENZIP_LEVEL if sevenzip_path else BUILTIN_LEVEL
+    rng = random.Random(seed)
+
+    # Stat pass: totals and a reservoir sample per (folder, extension)
+    groups = {}
+    for index, folder in enumerate(folders):
+        for batch in iter_folder_files(folder, onerror=lambda e: estimate.errors.append(str(e))):
+            for path, arcname, st in batch:
+                ext = _file_type(arcname)
+                group = groups.get((index, ext))
+                if group is None:
+                    group = groups[(index, ext)] = {'files': 0, 'bytes': 0, 'names': 0, 'samples': []}
+                group['files'] += 1
+                group['bytes'] += st.st_size
+                group['names'] += len(arcname.encode('utf-8'))
+                if len(group['samples']) < samples_per_type:
+                    group['samples'].append(path)
+                else:
+                    slot = rng.randrange(group['files'])
+                    if slot < samples_per_type:
+                        group['samples'][slot] = path
+
+    # Spread the sample budget over the groups (in random order, so a cap
+    # below the number of groups does not favour the first folders)
+    keys = list(groups)
+    rng.shuffle(keys)
+    chosen = _round_robin([[(key, path) for path in groups[key]['samples']] for key in keys],
+                          max_samples)
+
+    # 7-Zip only trials a subset, spread over the file types
+    trial = None
+    trial_items = set()
+    if sevenzip_path:
+        by_type = {}
+        for item in chosen:
+            by_type.setdefault(item[0][1], []).append(item)
+        trial_items = set(_round_robin(by_type.values(), ESTIMATE_SEVENZIP_SAMPLES))
+        trial = _SevenZipTrial(sevenzip_path, level)
+
+    # Read the samples one at a time, timing open() and read() separately;
+    # each one is compressed (or handed to 7-Zip) and dropped straight away
+    trial_input = {}
+    trial_output = {}
+    open_seconds = read_seconds = compress_seconds = 0.0
+    read_bytes = 0
+    try:
+        for key, path in chosen:
+            try:
+                start = time.perf_counter()
+                with open(path, 'rb') as f:
+                    opened = time.perf_counter()
+                    data = f.read(sample_bytes)
+                    read_seconds += time.perf_counter() - opened
+                open_seconds += opened - start
+            except OSError as e:
+                estimate.errors.append(str(e))
+                continue
+            estimate.sampled_files += 1
+            read_bytes += len(data)
+            if trial is None:
+                start = time.perf_counter()
+                trial_output[key] = trial_output.get(key, 0) + _deflate_size(data, level)
+                compress_seconds += time.perf_counter() - start
+            elif (key, path) in trial_items:
+                trial.add(key, data)
+            else:
+                continue
+            trial_input[key] = trial_input.get(key, 0) + len(data)
+        if trial is not None:
+            trial_output, compress_seconds = trial.run()
+    finally:
+        if trial is not None:
+            trial.close()
+    trial_bytes = sum(trial_input.values())
+
+    # Groups without a trialled sample use the ratio of their file type
+    type_input = {}
+    type_output = {}
+    for key, input_bytes in trial_input.items():
+        type_input[key[1]] = type_input.get(key[1], 0) + input_bytes
+        type_output[key[1]] = type_output.get(key[1], 0) + trial_output.get(key, 0)
+
+    # Extrapolate sizes per group, then per folder and disk
+    folder_output = [0] * len(folders)
+    for (index, ext), group in groups.items():
+        key = (index, ext)
+        if trial_input.get(key):
+            ratio = trial_output.get(key, 0) / trial_input[key]
+        elif type_input.get(ext):
+            ratio = type_output[ext] / type_input[ext]
+        else:
+            ratio = 1.0
+        output_bytes = group['bytes'] * ratio + group['files'] * ZIP_ENTRY_OVERHEAD + 2 * group['names']
+        folder_output[index] += output_bytes
+        totals = estimate.by_type.setdefault(ext, [0, 0, 0])
+        totals[0] += group['files']
+        totals[1] += group['bytes']
+        totals[2] += output_bytes
+        estimate.files += group['files']
+        estimate.input_bytes += group['bytes']
+    estimate.output_bytes = int(sum(folder_output))
+
+    # Time: per-file open cost plus per-byte read and compression cost
+    open_cost = open_seconds / estimate.sampled_files if estimate.sampled_files else 0.0
+    read_cost = read_seconds / read_bytes if read_bytes else 0.0
+    compress_cost = compress_seconds / trial_bytes if trial_bytes else 0.0
+    total_seconds = estimate.files * open_cost + estimate.input_bytes * (read_cost + compress_cost)
+    estimate.seconds = total_seconds / estimate.workers
+
+    # Disk space per device holding the archives (existing archives get overwritten)
+    disks = {}
+    for index, folder in enumerate(folders):
+        parent = Path(folder).parent
+        try:
+            device = os.stat(parent).st_dev
+            needed = folder_output[index]
+            existing = parent / f"{Path(folder).name}.zip"
+            if existing.exists():
+                needed -= existing.stat().st_size
+            if device not in disks:
+                disks[device] = [str(parent), 0, shutil.disk_usage(parent).free]
+            disks[device][1] += needed
+        except OSError as e:
+            estimate.errors.append(str(e))
+    estimate.disks = [(location, int(max(needed, 0)), free) for location, needed, free in disks.values()]
+
+    return estimate
+
+
+# Archives verified or extracted at the same time
+ARCHIVE_WORKERS = min(4, os.cpu_count() or 1)
+
+# Read size for archive members; large sequential reads keep disks streaming
+ARCHIVE_READ_SIZE = 4 * 1024 * 1024
+
+# Characters Windows does not allow in file names
+_WINDOWS_ILLEGAL = str.maketrans(':<>|"?*', '_______')
+
+
+def _member_target(destination, info):
+    """Path a member extracts to, with absolute paths and '..' removed like ZipFile.extract"""
+    parts = [part for part in info.filename.replace('\\', '/').split('/') if part not in ('', '.', '..')]
+    if os.sep == '\\':
+        parts = [part.translate(_WINDOWS_ILLEGAL).rstrip('.') for part in parts]
+    return os.path.join(destination, *parts)
+
+
+def verify_archive(archive_path, read_size=ARCHIVE_READ_SIZE):
+    """
+    CRC-test every member of a zip archive
+
+    Returns:
+        List of "member: error" strings, empty if the archive is intact
+    """
+    bad = []
+    with open(archive_path, 'rb', buffering=read_size) as f, zipfile.ZipFile(f) as zipf:
+        for info in zipf.infolist():
+            try:
+                with zipf.open(info) as member:
+                    while member.read(read_size):
+                        pass
+            except (zipfile.BadZipFile, zlib.error, EOFError, NotImplementedError) as e:
+                bad.append(f"{info.filename}: {e}")
+    return bad
+
+
+def _extract_members(archive_path, members, destination, read_size):
+    """Extract the given members through a private file handle"""
+    with open(archive_path, 'rb', buffering=read_size) as f, zipfile.ZipFile(f) as zipf:
+        for info in members:
+            target = _member_target(destination, info)
+            if info.is_dir():
+                os.makedirs(target, exist_ok=True)
+                continue
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with zipf.open(info) as src, open(target, 'wb') as dest:
+                shutil.copyfileobj(src, dest, read_size)
+
+
+def extract_archive(archive_path, destination, workers=1, read_size=ARCHIVE_READ_SIZE):
+    """
+    Extract a zip archive, optionally spreading its members over several threads
+
+    Members are split into `workers` groups of similar uncompressed size and
+    each group is extracted with its own file handle, so large archives
+    decompress in parallel (zlib releases the GIL). CRCs are checked while
+    extracting.
+    """
+    with zipfile.ZipFile(archive_path) as zipf:
+        members = zipf.infolist()
+
+    workers = max(1, min(workers, len(members)))
+    if workers == 1:
+        _extract_members(archive_path, members, destination, read_size)
+        return
+
+    # Largest members first, each to the currently lightest group
+    groups = [[] for _ in range(workers)]
+    loads = [(0, n) for n in range(workers)]
+    for info in sorted(members, key=lambda info: info.file_size, reverse=True):
+        load, n = heapq.heappop(loads)
+        groups[n].append(info)
+        heapq.heappush(loads, (load + info.file_size, n))
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_members, archive_path, group, destination, read_size)
+                   for group in groups]
+        for future in futures:
+            future.result()
+
+
+# Where the folder fingerprint index is kept between runs
+INDEX_PATH = Path.home() / '.batch_zip' / 'index.json'
+
+# Seconds between index writes during a run; changes in between are batched
+INDEX_FLUSH_SECONDS = 30
+
+
+def folder_fingerprint(folder_path):
+    """
+    Fingerprint a folder tree from file names, sizes and mtimes (no contents read)
+
+    Each file's (arcname, size, mtime) is hashed and the hashes are summed, so
+    the result does not depend on walk order and needs no sorting or memory
+    per file.
+    """
+    total = 0
+    count = 0
+    for batch in iter_folder_files(folder_path):
+        for _, arcname, st in batch:
+            record = f"{arcname}\0{st.st_size}\0{st.st_mtime_ns}".encode('utf-8', 'surrogateescape')
+            total += int.from_bytes(hashlib.blake2b(record, digest_size=16).digest(), 'little')
+            count += 1
+    return f"{count}:{total % (1 << 128):032x}"
+
+
+class FolderIndex:
+    """
+    Persistent map of folder -> fingerprint and the archive built from it
+
+    The index is a JSON file. Changes are queued in memory and written by
+    flush(), at most every INDEX_FLUSH_SECONDS and at the end of a run, so
+    the file is rewritten a handful of times per run rather than once per
+    folder. A flush takes an exclusive lock file, re-reads the index,
+    applies only the queued changes and atomically replaces the file, so
+    concurrent runs never drop each other's entries. Changes lost to a
+    crash only mean those folders are archived again next time.
+    """
+
+    def __init__(self, path=INDEX_PATH):
+        self.path = Path(path)
+        self._thread_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self.entries = self._load()
+
+    @staticmethod
+    def _key(folder_path):
+        return os.path.normcase(os.path.abspath(folder_path))
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    @contextmanager
+    def _locked(self):
+        """Hold the index lock file, across threads and processes"""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._thread_lock, open(f"{self.path}.lock", 'a+b') as lock_file:
+            if os.name == 'nt':
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after ~10 seconds; keep waiting
+                        continue
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    @staticmethod
+    def _apply(entries, changes):
+        for key, entry in changes.items():
+            if entry is None:
+                entries.pop(key, None)
+            else:
+                entries[key] = entry
+
+    def _update(self, key, entry):
+        """Queue setting (or removing, if entry is None) one entry; flushes when due"""
+        with self._pending_lock:
+            self._pending[key] = entry
+            self._apply(self.entries, {key: entry})
+            due = time.monotonic() - self._last_flush >= INDEX_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Merge the queued changes into the index file atomically"""
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        if not pending:
+            return
+        try:
+            with self._locked():
+                entries = self._load()
+                self._apply(entries, pending)
+                tmp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(entries, f, ensure_ascii=False)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.path)
+        except BaseException:
+            # Keep the changes for the next flush (newer ones win)
+            with self._pending_lock:
+                pending.update(self._pending)
+                self._pending = pending
+            raise
+        with self._pending_lock:
+            # Changes queued while the file was written stay on top
+            self._apply(entries, self._pending)
+            self.entries = entries
+
+    def is_unchanged(self, folder_path, fingerprint, archive_path):
+        """True if the folder still matches its fingerprint and its archive is untouched"""
+        entry = self.entries.get(self._key(folder_path))
+        if not entry or entry.get('fingerprint') != fingerprint:
+            return False
+        try:
+            st = os.stat(archive_path)
+        except OSError:
+            return False
+        return entry.get('archive_size') == st.st_size and entry.get('archive_mtime_ns') == st.st_mtime_ns
+
+    def record(self, folder_path, fingerprint, archive_path):
+        """Remember the fingerprint of a folder that was just archived"""
+        st = os.stat(archive_path)
+        self._update(self._key(folder_path), {
+            'fingerprint': fingerprint,
+            'archive': os.path.abspath(archive_path),
+            'archive_size': st.st_size,
+            'archive_mtime_ns': st.st_mtime_ns,
+        })
+
+    def forget(self, folder_path):
+        """Drop a folder from the index"""
+        if self._key(folder_path) in self.entries:
+            self._update(self._key(folder_path), None)
+
+
+# Folders or archives processed at the same time
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# List labels and colors (keys of BatchZipGUI.colors) of each job state
+JOB_STATES = {
+    'idle': ("", 'fg_primary'),
+    'pending': ("⏳ 等待中", 'fg_secondary'),
+    'running': ("⚙️ 處理中", 'accent_cyan'),
+    'done': ("✓ 完成", 'accent_green'),
+    'skipped': ("↷ 未變更", 'accent_purple'),
+    'failed': ("✗ 失敗", 'accent_red'),
+}
+
+# States a job can finish in
+FINISHED_STATES = ('done', 'skipped', 'failed')
+
+
+class Job:
+    """A folder or archive in the list, and where it is in processing"""
+
+    def __init__(self, path):
+        self.path = path
+        self.mode = None
+        self.priority = 0
+        self.state = 'idle'
+        self.message = ""
+
+
+class JobQueue:
+    """
+    Thread-safe priority queue that workers pull jobs from during a run
+
+    Lower priority values run first. Jobs can be added, reprioritized and
+    cancelled while workers are busy; stale heap entries are skipped when
+    popped. get() returns None once nothing is pending or running, which
+    closes the queue and ends the run; put() on a closed queue returns False.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = 0
+        self.pending = 0
+        self.running = 0
+        self.closed = True
+
+    def open(self):
+        """Start a new run"""
+        with self._cond:
+            self._heap = []
+            self.pending = 0
+            self.running = 0
+            self.closed = False
+
+    def _push(self, job):
+        self._seq += 1
+        heapq.heappush(self._heap, (job.priority, self._seq, job))
+
+    def put(self, job, priority):
+        """Queue a job; returns False if no run is active"""
+        with self._cond:
+            if self.closed:
+                return False
+            job.priority = priority
+            job.state = 'pending'
+            self._push(job)
+            self.pending += 1
+            self._cond.notify()
+            return True
+
+    def reprioritize(self, job, priority):
+        """Move a pending job to a new priority"""
+        with self._cond:
+            if job.state == 'pending' and job.priority != priority:
+                job.priority = priority
+                self._push(job)
+
+    def cancel(self, job):
+        """Cancel a pending job; returns False if it is not pending"""
+        with self._cond:
+            if job.state != 'pending':
+                return False
+            job.state = 'cancelled'
+            self.pending -= 1
+            self._cond.notify_all()
+            return True
+
+    def get(self):
+        """Block for the next job, or return None when the run is over"""
+        with self._cond:
+            while True:
+                while self._heap:
+                    priority, _, job = heapq.heappop(self._heap)
+                    if job.state == 'pending' and job.priority == priority:
+                        job.state = 'running'
+                        self.pending -= 1
+                        self.running += 1
+                        return job
+                if self.closed or self.running == 0:
+                    self.closed = True
+                    self._cond.notify_all()
+                    return None
+                self._cond.wait()
+
+    def task_done(self, job, state):
+        """Mark a job returned by get() as finished"""
+        with self._cond:
+            job.state = state
+            self.running -= 1
+            self._cond.notify_all()
+
+
+# Operation modes and their labels
+MODE_TEXTS = {
+    'replace': "更新並取代",
+    'delete': "更新並刪除",
+    'verify': "驗證 ZIP",
+    'extract': "解壓縮 ZIP",
+}
+
+# Modes that work on existing archives instead of folders
+ARCHIVE_MODES = ('verify', 'extract')
 
 
 class BatchZipGUI:
@@ -50,54 +1648,59 @@ class BatchZipGUI:
         # Apply dark theme to root
         self.root.configure(bg=self.colors['bg_dark'])
 
-        # List to store selected folders
+        # List to store selected folders, in display (and priority) order
         self.selected_folders = []
 
-        # Operation mode: 'replace' or 'delete'
+        # Job for every path in the list, and the queue workers pull them from
+        self.jobs = {}
+        self.job_queue = JobQueue()
+
+        # Worker threads post UI updates here; only the Tk thread touches widgets
+        self.ui_events = queue.Queue()
+
+        # Number of folders processed at the same time
+        self.worker_count = IntVar(value=DEFAULT_WORKERS)
+
+        # Adaptive compression level and its target (MB/s or HH:MM deadline)
+        self.adaptive_level = BooleanVar(value=False)
+        self.adaptive_target = StringVar(value="50")
+
+        # Low-memory writer for folders with millions of files (built-in compression only)
+        self.compact_writer = BooleanVar(value=False)
+
+        # Checksum manifest written next to every archive
+        self.write_manifest = BooleanVar(value=False)
+        self.manifest_algorithm = StringVar(value='sha256')
+        self.manifest_json = BooleanVar(value=False)
+
+        # Hashing pass after 7-Zip, overlapping the next folder's compression
+        self.manifest_pool = ThreadPoolExecutor(max_workers=1)
+        self.pending_manifests = 0
+
+        # Counters of the current run, and options captured when it started
+        self.run_stats = {'total': 0, 'finished': 0, 'success': 0, 'skipped': 0, 'errors': []}
+        self.run_options = {}
+        self.active_workers = 0
+
+        # Operation mode: 'replace', 'delete', 'verify' or 'extract'
         self.operation_mode = StringVar(value='replace')
 
         # Check for 7zip availability
         self.sevenzip_path = self._find_7zip()
         self.use_7zip = BooleanVar(value=bool(self.sevenzip_path))
 
+        # Estimate output size and time before starting a batch
+        self.estimate_first = BooleanVar(value=True)
+
+        # Skip folders that have not changed since their archive was built
+        self.skip_unchanged = BooleanVar(value=False)
+
         self._setup_ui()
+        self.root.after(100, self._poll_ui_events)
 
     def _find_7zip(self):
         """Find 7zip executable on the system"""
-        system = platform.system()
-        possible_paths = []
-
-        if system == 'Windows':
-            possible_paths = [
-                r'C:\Program Files\7-Zip\7z.exe',
-                r'C:\Program Files (x86)\7-Zip\7z.exe',
-            ]
-        elif system == 'Darwin':  # macOS
-            possible_paths = [
-                '/usr/local/bin/7z',
-                '/opt/homebrew/bin/7z',
-                '/usr/bin/7z',
-            ]
-        else:  # Linux
-            possible_paths = [
-                '/usr/bin/7z',
-                '/usr/local/bin/7z',
-            ]
-
-        # Check each path
-        for path in possible_paths:
-            if os.path.exists(path):
-                return path
-
-        # Try to find in PATH
-        try:
-            result = subprocess.run(['which', '7z'], capture_output=True, text=True)
-            if result.returncode == 0:
-                return result.stdout.strip()
-        except:
-            pass
-
-        return None
+        return find_7zip()
 
     def _setup_ui(self):
         """Setup the user interface"""
@@ -219,6 +1822,38 @@ class BatchZipGUI:
             activebackground='#6b7885',
             activeforeground='#000000',
             disabledforeground='#000000'
+        ).pack(side=LEFT, padx=(0, 10))
+
+        Button(
+            button_frame,
+            text="⬆ 上移",
+            command=lambda: self.move_selected(-1),
+            bg=self.colors['accent_gray'],
+            fg='#000000',
+            font=('Helvetica', 10, 'bold'),
+            padx=12,
+            pady=8,
+            cursor='hand2',
+            relief=FLAT,
+            activebackground='#6b7885',
+            activeforeground='#000000',
+            disabledforeground='#000000'
+        ).pack(side=LEFT, padx=(0, 10))
+
+        Button(
+            button_frame,
+            text="⬇ 下移",
+            command=lambda: self.move_selected(1),
+            bg=self.colors['accent_gray'],
+            fg='#000000',
+            font=('Helvetica', 10, 'bold'),
+            padx=12,
+            pady=8,
+            cursor='hand2',
+            relief=FLAT,
+            activebackground='#6b7885',
+            activeforeground='#000000',
+            disabledforeground='#000000'
         ).pack(side=LEFT)
 
         # Options frame
@@ -261,6 +1896,162 @@ class BatchZipGUI:
             activeforeground=self.colors['fg_primary']
         ).pack(anchor=W, pady=2)
 
+        Radiobutton(
+            options_frame,
+            text="驗證 (Verify) - 檢查列表中 ZIP 檔案的 CRC",
+            variable=self.operation_mode,
+            value='verify',
+            font=('Helvetica', 10),
+            cursor='hand2',
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary'],
+            selectcolor=self.colors['bg_light'],
+            activebackground=self.colors['bg_dark'],
+            activeforeground=self.colors['fg_primary']
+        ).pack(anchor=W, pady=2)
+
+        Radiobutton(
+            options_frame,
+            text="解壓縮 (Extract) - 將列表中的 ZIP 檔案解壓縮到所在位置",
+            variable=self.operation_mode,
+            value='extract',
+            font=('Helvetica', 10),
+            cursor='hand2',
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary'],
+            selectcolor=self.colors['bg_light'],
+            activebackground=self.colors['bg_dark'],
+            activeforeground=self.colors['fg_primary']
+        ).pack(anchor=W, pady=2)
+
+        Checkbutton(
+            options_frame,
+            text="開始前估算壓縮後大小與所需時間",
+            variable=self.estimate_first,
+            font=('Helvetica', 10),
+            cursor='hand2',
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary'],
+            selectcolor=self.colors['bg_light'],
+            activebackground=self.colors['bg_dark'],
+            activeforeground=self.colors['fg_primary']
+        ).pack(anchor=W, pady=2)
+
+        Checkbutton(
+            options_frame,
+            text="略過自上次壓縮後未變更的資料夾 (僅限更新並取代)",
+            variable=self.skip_unchanged,
+            font=('Helvetica', 10),
+            cursor='hand2',
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary'],
+            selectcolor=self.colors['bg_light'],
+            activebackground=self.colors['bg_dark'],
+            activeforeground=self.colors['fg_primary']
+        ).pack(anchor=W, pady=2)
+
+        workers_frame = Frame(options_frame, bg=self.colors['bg_dark'])
+        workers_frame.pack(anchor=W, pady=2)
+
+        Label(
+            workers_frame,
+            text="同時處理數量:",
+            font=('Helvetica', 10),
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary']
+        ).pack(side=LEFT)
+
+        Spinbox(
+            workers_frame,
+            from_=1,
+            to=32,
+            width=4,
+            textvariable=self.worker_count,
+            font=('Helvetica', 10),
+            bg=self.colors['bg_light'],
+            fg=self.colors['fg_primary'],
+            buttonbackground=self.colors['bg_medium'],
+            insertbackground=self.colors['fg_primary'],
+            highlightthickness=0
+        ).pack(side=LEFT, padx=(5, 0))
+
+        adaptive_frame = Frame(options_frame, bg=self.colors['bg_dark'])
+        adaptive_frame.pack(anchor=W, pady=2)
+
+        Checkbutton(
+            adaptive_frame,
+            text="自動調整壓縮等級，目標 (MB/s 或截止時間 HH:MM):",
+            variable=self.adaptive_level,
+            font=('Helvetica', 10),
+            cursor='hand2',
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary'],
+            selectcolor=self.colors['bg_light'],
+            activebackground=self.colors['bg_dark'],
+            activeforeground=self.colors['fg_primary']
+        ).pack(side=LEFT)
+
+        Entry(
+            adaptive_frame,
+            textvariable=self.adaptive_target,
+            width=8,
+            font=('Helvetica', 10),
+            bg=self.colors['bg_light'],
+            fg=self.colors['fg_primary'],
+            insertbackground=self.colors['fg_primary'],
+            highlightthickness=0
+        ).pack(side=LEFT, padx=(5, 0))
+
+        Checkbutton(
+            options_frame,
+            text="大量檔案模式 (低記憶體，適合數百萬個檔案；使用內建壓縮)",
+            variable=self.compact_writer,
+            font=('Helvetica', 10),
+            cursor='hand2',
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary'],
+            selectcolor=self.colors['bg_light'],
+            activebackground=self.colors['bg_dark'],
+            activeforeground=self.colors['fg_primary']
+        ).pack(anchor=W, pady=2)
+
+        manifest_frame = Frame(options_frame, bg=self.colors['bg_dark'])
+        manifest_frame.pack(anchor=W, pady=2)
+
+        Checkbutton(
+            manifest_frame,
+            text="產生校驗清單:",
+            variable=self.write_manifest,
+            font=('Helvetica', 10),
+            cursor='hand2',
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary'],
+            selectcolor=self.colors['bg_light'],
+            activebackground=self.colors['bg_dark'],
+            activeforeground=self.colors['fg_primary']
+        ).pack(side=LEFT)
+
+        ttk.Combobox(
+            manifest_frame,
+            textvariable=self.manifest_algorithm,
+            values=MANIFEST_ALGORITHMS,
+            state='readonly',
+            width=9
+        ).pack(side=LEFT, padx=(5, 10))
+
+        Checkbutton(
+            manifest_frame,
+            text="JSON 格式",
+            variable=self.manifest_json,
+            font=('Helvetica', 10),
+            cursor='hand2',
+            bg=self.colors['bg_dark'],
+            fg=self.colors['fg_primary'],
+            selectcolor=self.colors['bg_light'],
+            activebackground=self.colors['bg_dark'],
+            activeforeground=self.colors['fg_primary']
+        ).pack(side=LEFT)
+
         # 7zip option
         if self.sevenzip_path:
             ttk.Separator(options_frame, orient='horizontal').pack(fill=X, pady=8)
@@ -353,7 +2144,7 @@ class BatchZipGUI:
         # Show dialog asking for single or multi-select mode
         dialog = Toplevel(self.root)
         dialog.title("選擇加入方式")
-        dialog.geometry("400x180")
+        dialog.geometry("600x180")
         dialog.resizable(False, False)
         dialog.transient(self.root)
         dialog.grab_set()
@@ -385,6 +2176,10 @@ class BatchZipGUI:
             dialog.destroy()
             self._add_multiple_folders()
 
+        def archive_mode():
+            dialog.destroy()
+            self._add_archives()
+
         Button(
             button_frame,
             text="📁 單一資料夾\n(選擇一個資料夾)",
@@ -419,22 +2214,60 @@ class BatchZipGUI:
             disabledforeground='#000000'
         ).pack(side=LEFT, padx=10)
 
+        Button(
+            button_frame,
+            text="🗜️ ZIP 檔案\n(驗證或解壓縮用)",
+            command=archive_mode,
+            bg=self.colors['accent_cyan'],
+            fg='#000000',
+            font=('Helvetica', 10, 'bold'),
+            padx=20,
+            pady=15,
+            width=18,
+            cursor='hand2',
+            relief=FLAT,
+            activebackground='#3fcad8',
+            activeforeground='#000000',
+            disabledforeground='#000000'
+        ).pack(side=LEFT, padx=10)
+
         dialog.wait_window()
 
     def _add_single_folder(self):
         """Add a single folder"""
         folder = filedialog.askdirectory(title="選取資料夾")
         if folder:
-            if folder not in self.selected_folders:
-                self.selected_folders.append(folder)
-                self.folder_listbox.insert(END, folder)
-            else:
+            if not self._add_path(folder):
                 messagebox.showinfo("資訊", "此資料夾已在列表中")
 
             # Ask if user wants to add more
             if messagebox.askyesno("加入更多", "是否要加入更多資料夾？"):
                 self.add_folders()
 
+    def _add_archives(self):
+        """Add zip archives to verify or extract"""
+        archives = filedialog.askopenfilenames(
+            title="選取 ZIP 檔案",
+            filetypes=[("ZIP 檔案", "*.zip"), ("所有檔案", "*.*")]
+        )
+        if not archives:
+            return
+
+        added_count = 0
+        duplicate_count = 0
+
+        for archive_path in archives:
+            if self._add_path(archive_path):
+                added_count += 1
+            else:
+                duplicate_count += 1
+
+        message = f"已加入 {added_count} 個 ZIP 檔案"
+        if duplicate_count > 0:
+            message += f"\n（{duplicate_count} 個已在列表中，已略過）"
+
+        messagebox.showinfo("完成", message)
+
     def _add_multiple_folders(self):
         """Add multiple folders from a parent directory"""
         parent_folder = filedialog.askdirectory(title="選取父資料夾（將顯示其中的子資料夾供您選擇）")
@@ -564,9 +2397,7 @@ class BatchZipGUI:
             duplicate_count = 0
 
             for folder_path in selected:
-                if folder_path not in self.selected_folders:
-                    self.selected_folders.append(folder_path)
-                    self.folder_listbox.insert(END, folder_path)
+                if self._add_path(folder_path):
                     added_count += 1
                 else:
                     duplicate_count += 1
@@ -645,11 +2476,9 @@ class BatchZipGUI:
             if not file_path:
                 continue
 
-            # Check if it's a directory
-            if os.path.isdir(file_path):
-                if file_path not in self.selected_folders:
-                    self.selected_folders.append(file_path)
-                    self.folder_listbox.insert(END, file_path)
+            # Check if it's a directory or a zip archive
+            if os.path.isdir(file_path) or (file_path.lower().endswith('.zip') and os.path.isfile(file_path)):
+                if self._add_path(file_path):
                     added_count += 1
                 else:
                     duplicate_count += 1
@@ -662,16 +2491,82 @@ class BatchZipGUI:
             if duplicate_count > 0:
                 message += f"\n（{duplicate_count} 個已在列表中，已略過）"
             if invalid_count > 0:
-                message += f"\n（{invalid_count} 個非資料夾項目已略過）"
+                message += f"\n（{invalid_count} 個非資料夾或 ZIP 項目已略過）"
 
             # Use a simple status update instead of a popup for better UX
             self.progress_label.config(text=message, fg=self.colors['accent_green'])
             self.root.after(3000, lambda: self.progress_label.config(text="準備開始...", fg=self.colors['fg_secondary']))
         elif invalid_count > 0:
-            message = f"⚠️ {invalid_count} 個項目不是資料夾"
+            message = f"⚠️ {invalid_count} 個項目不是資料夾或 ZIP 檔案"
             self.progress_label.config(text=message, fg=self.colors['accent_red'])
             self.root.after(3000, lambda: self.progress_label.config(text="準備開始...", fg=self.colors['fg_secondary']))
 
+    def _add_path(self, path):
+        """
+        Append a folder or archive to the list
+
+        While a batch is running the new job goes straight into the queue
+        with the operation mode the batch was started (and confirmed) with.
+
+        Returns:
+            False if the path is already in the list
+        """
+        if path in self.selected_folders:
+            return False
+
+        job = Job(path)
+        self.selected_folders.append(path)
+        self.jobs[path] = job
+        self.folder_listbox.insert(END, path)
+
+        # Late additions run with the mode the batch was confirmed for, never
+        # with whatever the radio buttons show now (that could skip the delete
+        # confirmation or apply verify/extract to folders)
+        job.mode = self.run_options.get('mode')
+        if self.job_queue.put(job, len(self.selected_folders) - 1):
+            self.run_stats['total'] += 1
+            self.progress_bar['maximum'] = self.run_stats['total']
+            self._measure_work([job])
+        self._refresh_item(len(self.selected_folders) - 1)
+        return True
+
+    def _refresh_item(self, index):
+        """Redraw one list row with its job state"""
+        path = self.selected_folders[index]
+        label, color = JOB_STATES[self.jobs[path].state]
+        selected = self.folder_listbox.selection_includes(index)
+        self.folder_listbox.delete(index)
+        self.folder_listbox.insert(index, f"{label}  {path}" if label else path)
+        self.folder_listbox.itemconfig(index, fg=self.colors[color])
+        if selected:
+            self.folder_listbox.selection_set(index)
+
+    def _reprioritize(self):
+        """Give pending jobs the priority of their current list position"""
+        for index, path in enumerate(self.selected_folders):
+            self.job_queue.reprioritize(self.jobs[path], index)
+
+    def _remove_items(self, indices):
+        """Remove rows (cancelling pending jobs); running jobs stay. Returns the number kept"""
+        kept = 0
+        for index in sorted(indices, reverse=True):
+            path = self.selected_folders[index]
+            job = self.jobs[path]
+            # cancel() decides under the queue lock: a worker may have taken
+            # the job since its state was last looked at
+            cancelled = self.job_queue.cancel(job)
+            if not cancelled and job.state == 'running':
+                kept += 1
+                continue
+            if cancelled and self.run_options.get('controller') is not None:
+                # Its bytes will never be compressed; drop them from the deadline's work
+                self.run_options['controller'].finish_work(job)
+            self.folder_listbox.delete(index)
+            del self.selected_folders[index]
+            del self.jobs[path]
+        self._reprioritize()
+        return kept
+
     def remove_selected(self):
         """Remove selected items from the list"""
         selected_indices = self.folder_listbox.curselection()
@@ -679,32 +2574,90 @@ class BatchZipGUI:
             messagebox.showwarning("警告", "請先選取要移除的項目")
             return
 
-        # Remove in reverse order to avoid index shifting
-        for index in reversed(selected_indices):
-            self.folder_listbox.delete(index)
-            del self.selected_folders[index]
+        if self._remove_items(selected_indices):
+            messagebox.showinfo("資訊", "正在處理中的項目無法移除")
+
+    def move_selected(self, offset):
+        """Move the selected items up (-1) or down (1); pending jobs follow their new position"""
+        selected_indices = list(self.folder_listbox.curselection())
+        if not selected_indices:
+            messagebox.showwarning("警告", "請先選取要移動的項目")
+            return
+
+        if offset > 0:
+            selected_indices.reverse()
+        moved = []
+        for index in selected_indices:
+            target = index + offset
+            if not 0 <= target < len(self.selected_folders) or target in moved:
+                moved.append(index)
+                continue
+            folders = self.selected_folders
+            folders[index], folders[target] = folders[target], folders[index]
+            self.folder_listbox.selection_clear(index)
+            self.folder_listbox.selection_set(target)
+            self._refresh_item(index)
+            self._refresh_item(target)
+            moved.append(target)
+
+        self._reprioritize()
 
     def clear_list(self):
         """Clear all items from the list"""
         if self.selected_folders and messagebox.askyesno("確認", "確定要清空所有項目？"):
-            self.folder_listbox.delete(0, END)
-            self.selected_folders.clear()
+            if self._remove_items(range(len(self.selected_folders))):
+                messagebox.showinfo("資訊", "正在處理中的項目無法移除")
 
-    def zip_folder(self, folder_path, output_path):
+    def zip_folder(self, folder_path, output_path, use_7zip=None, controller=None, compact=False,
+                   manifest=None):
         """
         Zip a folder to output_path using 7zip or built-in zipfile
 
         Args:
             folder_path: Path to the folder to zip
-            output_path: Path where to save the zip file
+            output_path: Path where to save the zip file, or a stream target
+                accepted by open_sink(). Streams always use the built-in writer,
+                since 7-Zip can only write zip archives to seekable files.
+            use_7zip: Override the 7-Zip checkbox (worker threads pass the
+                value captured when the batch started)
+            controller: Optional AdaptiveLevelController choosing the level
+            compact: Use the low-memory CompactZipWriter (built-in only)
+            manifest: Optional (algorithm, as_json) to write a checksum
+                manifest next to the archive. The built-in writer hashes the
+                chunks it compresses; after 7-Zip the folder is hashed again.
+                Ignored for stream targets, which have no place for a sidecar.
         """
-        if self.use_7zip.get() and self.sevenzip_path:
-            return self._zip_with_7zip(folder_path, output_path)
-        else:
-            return self._zip_with_builtin(folder_path, output_path)
+        sink = open_sink(output_path)
+        if sink is not None:
+            with sink:
+                return write_builtin_zip(folder_path, sink, controller, compact)
+
+        if use_7zip is None:
+            use_7zip = self.use_7zip.get()
+        if use_7zip and self.sevenzip_path and not compact:
+            self._zip_with_7zip(folder_path, output_path, controller)
+            if manifest:
+                hash_folder_manifest(folder_path, output_path, *manifest)
+            return True
+
+        if not manifest:
+            return self._zip_with_builtin(folder_path, output_path, controller, compact)
 
-    def _zip_with_7zip(self, folder_path, output_path):
+        hasher = ManifestHasher(manifest[0])
+        try:
+            self._zip_with_builtin(folder_path, output_path, controller, compact, hasher)
+        except BaseException:
+            # A hashing error must not replace the archive's own error
+            hasher.abort()
+            raise
+        with hasher.close() as entries:
+            write_manifest(output_path, entries, *manifest)
+        return True
+
+    def _zip_with_7zip(self, folder_path, output_path, controller=None):
         """Zip using 7zip for better compression"""
+        # 7-Zip takes one level per folder, so the controller tunes whole folders
+        level = controller.level('*') if controller else SEVENZIP_LEVEL
         try:
             # Use 7zip command line
             # -tzip: zip format, -mx=9: maximum compression
@@ -712,92 +2665,269 @@ class BatchZipGUI:
                 self.sevenzip_path,
                 'a',  # add to archive
                 '-tzip',  # zip format
-                '-mx=9',  # maximum compression
+                f'-mx={level}',  # compression level
                 str(output_path),
                 str(folder_path)
             ]
 
+            start = time.perf_counter()
             result = subprocess.run(
                 cmd,
                 capture_output=True,
                 text=True,
                 check=True
             )
+            # Stop the clock before the size walk, which is not compression time
+            seconds = time.perf_counter() - start
+            if controller:
+                input_bytes = sum(st.st_size for batch in iter_folder_files(folder_path) for _, _, st in batch)
+                controller.record('*', level, input_bytes, os.path.getsize(output_path), seconds)
             return True
         except subprocess.CalledProcessError as e:
             raise Exception(f"7-Zip 錯誤: {e.stderr}")
         except Exception as e:
             raise Exception(f"7-Zip 壓縮失敗: {str(e)}")
 
-    def _zip_with_builtin(self, folder_path, output_path):
+    def _zip_with_builtin(self, folder_path, output_path, controller=None, compact=False, hasher=None):
         """Zip using Python's built-in zipfile module"""
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-            folder_path = Path(folder_path)
-            for file_path in folder_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate the relative path for the archive
-                    arcname = file_path.relative_to(folder_path.parent)
-                    zipf.write(file_path, arcname)
-        return True
+        return write_builtin_zip(folder_path, output_path, controller, compact, hasher)
 
     def process_folders(self):
-        """Process all folders in the list"""
+        """Queue every item in the list and start the worker threads"""
         if not self.selected_folders:
             messagebox.showwarning("警告", "請先加入要壓縮的資料夾")
             return
 
         mode = self.operation_mode.get()
-        total = len(self.selected_folders)
-        success_count = 0
-        error_count = 0
-        errors = []
+        compact = self.compact_writer.get()
+        use_7zip = bool(self.use_7zip.get() and self.sevenzip_path) and not compact
+        try:
+            workers = max(1, int(self.worker_count.get()))
+        except (TclError, ValueError):
+            workers = 1
+
+        controller = None
+        if self.adaptive_level.get() and mode not in ARCHIVE_MODES:
+            try:
+                rate, deadline = parse_adaptive_target(self.adaptive_target.get())
+            except ValueError:
+                messagebox.showwarning("警告", "壓縮目標格式錯誤，請輸入 MB/s (例如 50) 或截止時間 (例如 06:30)")
+                return
+            if use_7zip:
+                controller = AdaptiveLevelController(SEVENZIP_LEVELS, SEVENZIP_LEVEL, rate, deadline, workers)
+            else:
+                controller = AdaptiveLevelController(BUILTIN_LEVELS, BUILTIN_LEVEL, rate, deadline, workers)
+
+        self.run_stats = {'total': 0, 'finished': 0, 'success': 0, 'skipped': 0, 'errors': []}
+        self.run_options = {
+            'mode': mode,
+            'use_7zip': use_7zip,
+            'skip_unchanged': self.skip_unchanged.get(),
+            'index': FolderIndex(),
+            'controller': controller,
+            'compact': compact,
+            'manifest': (self.manifest_algorithm.get(), self.manifest_json.get()) if self.write_manifest.get() else None,
+        }
 
-        self.progress_bar['maximum'] = total
+        self.job_queue.open()
+        for index, path in enumerate(self.selected_folders):
+            job = self.jobs[path]
+            job.mode = mode
+            job.message = ""
+            self.job_queue.put(job, index)
+            self.run_stats['total'] += 1
+            self._refresh_item(index)
+
+        self.progress_bar['maximum'] = self.run_stats['total']
         self.progress_bar['value'] = 0
 
-        for i, folder_path in enumerate(self.selected_folders):
-            try:
-                folder_path = Path(folder_path)
-                if not folder_path.exists():
-                    error_count += 1
-                    errors.append(f"{folder_path.name}: 資料夾不存在")
-                    continue
+        self._measure_work([self.jobs[path] for path in self.selected_folders])
 
-                if not folder_path.is_dir():
-                    error_count += 1
-                    errors.append(f"{folder_path.name}: 不是有效的資料夾")
-                    continue
+        self.active_workers = workers
+        for _ in range(workers):
+            threading.Thread(target=self._worker_loop, daemon=True).start()
 
-                # Update progress label
-                self.progress_label.config(
-                    text=f"正在壓縮 ({i+1}/{total}): {folder_path.name}"
-                )
-                self.root.update()
+    def _measure_work(self, jobs):
+        """In deadline mode, tell the adaptive controller how many bytes each job queues"""
+        controller = self.run_options.get('controller')
+        if controller is None or controller.deadline is None:
+            return
 
-                # Create zip file with the same name as the folder
-                zip_path = folder_path.parent / f"{folder_path.name}.zip"
+        def measure():
+            for job in jobs:
+                if os.path.isdir(job.path):
+                    for batch in iter_folder_files(job.path, onerror=lambda e: None):
+                        controller.add_work(sum(st.st_size for _, _, st in batch), job)
+
+        threading.Thread(target=measure, daemon=True).start()
+
+    def _worker_loop(self):
+        """Pull jobs until the queue is drained; runs in a worker thread"""
+        while True:
+            job = self.job_queue.get()
+            if job is None:
+                break
+            self.ui_events.put(('started', job))
+            controller = self.run_options.get('controller')
+            if controller is not None:
+                controller.start_work(job)
+            try:
+                state = self._run_job(job)
+                job.message = ""
+            except Exception as e:
+                state = 'failed'
+                job.message = str(e)
+            finally:
+                if controller is not None:
+                    controller.finish_work(job)
+            self.job_queue.task_done(job, state)
+            self.ui_events.put(('finished', job))
+        self.ui_events.put(('worker_exit', None))
 
-                # Zip the folder
-                self.zip_folder(folder_path, zip_path)
+    def _run_job(self, job):
+        """
+        Process one folder or archive; runs in a worker thread
 
-                # If mode is delete, remove the original folder
-                if mode == 'delete':
-                    shutil.rmtree(folder_path)
+        Returns:
+            'done', or 'skipped' if the folder is unchanged since its last archive
+        """
+        path = Path(job.path)
+        options = self.run_options
+
+        if job.mode in ARCHIVE_MODES:
+            if not path.is_file():
+                raise Exception("不是有效的 ZIP 檔案")
+            if job.mode == 'verify':
+                bad = verify_archive(path)
+                if bad:
+                    raise Exception(f"{len(bad)} 個檔案損毀 ({bad[0]})")
+            else:
+                # With nothing else waiting, extract the members of this archive in parallel
+                member_workers = ARCHIVE_WORKERS if self.job_queue.pending == 0 else 1
+                extract_archive(path, path.parent, workers=member_workers)
+            return 'done'
+
+        if not path.exists():
+            raise Exception("資料夾不存在")
+        if not path.is_dir():
+            raise Exception("不是有效的資料夾")
+
+        # Create zip file with the same name as the folder
+        zip_path = path.parent / f"{path.name}.zip"
+        index = options['index']
+
+        # Skip folders whose tree and archive are unchanged since the last run
+        use_index = options['skip_unchanged'] and job.mode == 'replace'
+        if use_index:
+            fingerprint = folder_fingerprint(path)
+            if index.is_unchanged(path, fingerprint, zip_path):
+                return 'skipped'
+
+        # 7-Zip reads the files itself, so its manifest comes from a separate
+        # hashing pass that runs while this worker compresses the next folder
+        manifest = options['manifest']
+        pipelined = bool(manifest and options['use_7zip'])
+
+        # Zip the folder
+        self.zip_folder(path, zip_path, use_7zip=options['use_7zip'], controller=options['controller'],
+                        compact=options['compact'], manifest=None if pipelined else manifest)
+
+        if use_index:
+            index.record(path, fingerprint, zip_path)
+
+        if pipelined:
+            # The original folder can only go once it has been hashed
+            def finish_manifest():
+                hash_folder_manifest(path, zip_path, *manifest)
+                if job.mode == 'delete':
+                    shutil.rmtree(path)
+                    index.forget(path)
+
+            self.ui_events.put(('manifest_started', job))
+            future = self.manifest_pool.submit(finish_manifest)
+            future.add_done_callback(lambda f: self.ui_events.put(('manifest_done', (job, f))))
+            return 'done'
+
+        # If mode is delete, remove the original folder
+        if job.mode == 'delete':
+            shutil.rmtree(path)
+            index.forget(path)
+
+        return 'done'
+
+    def _poll_ui_events(self):
+        """Apply job updates posted by worker threads; runs in the Tk thread"""
+        try:
+            while True:
+                event, job = self.ui_events.get_nowait()
+                if event == 'estimate':
+                    self._confirm_batch(job)
+                    continue
 
-                success_count += 1
+                if event == 'worker_exit':
+                    self.active_workers -= 1
+                    if self.active_workers == 0 and self.pending_manifests == 0:
+                        self._finish_run()
+                    continue
 
-            except Exception as e:
-                error_count += 1
-                errors.append(f"{folder_path.name}: {str(e)}")
+                if event == 'manifest_started':
+                    self.pending_manifests += 1
+                    continue
 
-            finally:
-                self.progress_bar['value'] = i + 1
-                self.root.update()
+                if event == 'manifest_done':
+                    job, future = job
+                    self.pending_manifests -= 1
+                    if future.exception() is not None:
+                        self.run_stats['errors'].append(f"{Path(job.path).name}: 校驗清單失敗: {future.exception()}")
+                    if self.active_workers == 0 and self.pending_manifests == 0:
+                        self._finish_run()
+                    continue
+
+                if event == 'started':
+                    name = Path(job.path).name
+                    self.progress_label.config(
+                        text=f"正在處理 ({self.run_stats['finished'] + 1}/{self.run_stats['total']}): {name}"
+                    )
+                else:
+                    stats = self.run_stats
+                    stats['finished'] += 1
+                    if job.state == 'done':
+                        stats['success'] += 1
+                    elif job.state == 'skipped':
+                        stats['skipped'] += 1
+                    else:
+                        stats['errors'].append(f"{Path(job.path).name}: {job.message}")
+                    self.progress_bar['value'] = stats['finished']
+
+                if job.path in self.jobs and self.jobs[job.path] is job:
+                    self._refresh_item(self.selected_folders.index(job.path))
+        except queue.Empty:
+            pass
+        self.root.after(100, self._poll_ui_events)
 
-        # Show completion message
+    def _finish_run(self):
+        """All workers have exited: summarize the run"""
+        stats = self.run_stats
+        mode = self.run_options['mode']
+        try:
+            self.run_options['index'].flush()
+        except OSError as e:
+            stats['errors'].append(f"無法更新索引 {INDEX_PATH}: {e}")
+        if mode == 'verify':
+            title = "批次驗證完成！"
+        elif mode == 'extract':
+            title = "批次解壓縮完成！"
+        else:
+            title = "批次壓縮完成！"
+        self._finish_batch(title, stats['success'], len(stats['errors']), stats['errors'], stats['skipped'])
+
+    def _finish_batch(self, title, success_count, error_count, errors, skipped_count=0):
+        """Show the completion summary and reset the UI"""
         self.progress_label.config(text="完成！")
 
-        message = f"批次壓縮完成！\n\n成功: {success_count}\n失敗: {error_count}"
+        message = f"{title}\n\n成功: {success_count}\n失敗: {error_count}"
+        if skipped_count:
+            message += f"\n略過 (未變更): {skipped_count}"
         if errors:
             message += "\n\n錯誤詳情:\n" + "\n".join(errors[:5])
             if len(errors) > 5:
@@ -808,9 +2938,12 @@ class BatchZipGUI:
         # Re-enable the start button
         self.start_button.config(state=NORMAL)
 
-        # Clear the list after successful operation
+        # Clear the list after successful operation (failed items stay for a retry)
         if success_count > 0 and messagebox.askyesno("清空列表", "是否要清空已處理的項目？"):
-            self.clear_list()
+            self._remove_items([
+                index for index, path in enumerate(self.selected_folders)
+                if self.jobs[path].state in ('done', 'skipped')
+            ])
 
     def start_batch_zip(self):
         """Start the batch zip process"""
@@ -818,28 +2951,115 @@ class BatchZipGUI:
             messagebox.showwarning("警告", "請先加入要壓縮的資料夾")
             return
 
+        # Disable the start button while estimating and processing
+        self.start_button.config(state=DISABLED)
+
+        if not self.estimate_first.get() or self.operation_mode.get() in ARCHIVE_MODES:
+            self._confirm_batch(None)
+            return
+
+        self.progress_label.config(text="正在估算壓縮後大小與所需時間...")
+        folders = list(self.selected_folders)
+        # The compact writer is builtin-only, so estimate with what will run
+        use_7zip = self.use_7zip.get() and not self.compact_writer.get()
+        sevenzip_path = self.sevenzip_path if use_7zip else None
+        try:
+            workers = max(1, int(self.worker_count.get()))
+        except (TclError, ValueError):
+            workers = 1
+
+        def run_estimate():
+            try:
+                estimate = estimate_batch(folders, sevenzip_path=sevenzip_path, workers=workers)
+            except Exception as e:
+                estimate = None
+                print(f"估算失敗: {e}", file=sys.stderr)
+            # Only the Tk thread touches widgets; _poll_ui_events shows the dialog
+            self.ui_events.put(('estimate', estimate))
+
+        threading.Thread(target=run_estimate, daemon=True).start()
+
+    def _confirm_batch(self, estimate):
+        """Ask for confirmation (showing the estimate if there is one) and start processing"""
+        self.progress_label.config(text="準備開始...")
+
         mode = self.operation_mode.get()
-        mode_text = "更新並取代" if mode == 'replace' else "更新並刪除"
+        mode_text = MODE_TEXTS[mode]
 
         # Confirm before starting
-        confirm_message = f"即將使用「{mode_text}」模式壓縮 {len(self.selected_folders)} 個資料夾。"
+        if mode in ARCHIVE_MODES:
+            confirm_message = f"即將使用「{mode_text}」模式處理 {len(self.selected_folders)} 個 ZIP 檔案。"
+        else:
+            confirm_message = f"即將使用「{mode_text}」模式壓縮 {len(self.selected_folders)} 個資料夾。"
+        if estimate is not None:
+            confirm_message += "\n\n" + estimate.format()
+            if not estimate.fits:
+                confirm_message += "\n\n⚠️ 警告：磁碟空間可能不足！"
         if mode == 'delete':
             confirm_message += "\n\n⚠️ 警告：原始資料夾將會被刪除！"
         confirm_message += "\n\n確定要繼續嗎？"
 
         if not messagebox.askyesno("確認", confirm_message):
+            self.start_button.config(state=NORMAL)
             return
 
-        # Disable the start button
-        self.start_button.config(state=DISABLED)
-
-        # Start processing in a separate thread
-        thread = threading.Thread(target=self.process_folders, daemon=True)
-        thread.start()
+        # Queue the list and start the worker threads
+        self.process_folders()
+        if self.job_queue.closed:
+            self.start_button.config(state=NORMAL)
 
 
-def main():
+def main(argv=None):
     """Main entry point"""
+    parser = argparse.ArgumentParser(description="Batch ZIP - 批次壓縮工具")
+    parser.add_argument('--stream', metavar='FOLDER',
+                        help="不開啟視窗，直接將資料夾壓縮並串流輸出")
+    parser.add_argument('--output', metavar='TARGET', default='-',
+                        help="串流目標: '-' (stdout)、unix:/path/to.sock 或 http(s)://host/path (預設: -)")
+    parser.add_argument('--compact', action='store_true',
+                        help="串流時使用低記憶體的大量檔案模式")
+    parser.add_argument('--manifest', choices=MANIFEST_ALGORITHMS,
+                        help="輸出到本機檔案時，同時產生校驗清單 (例如 folder.zip.sha256)")
+    parser.add_argument('--estimate', nargs='+', metavar='FOLDER',
+                        help="不開啟視窗，只估算壓縮後大小、所需時間與磁碟空間")
+    parser.add_argument('--7zip', dest='use_7zip', action='store_true',
+                        help="估算時使用 7-Zip (需已安裝)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="估算時假設的同時壓縮數量 (預設: 1)")
+    args = parser.parse_args(argv)
+
+    if args.estimate:
+        sevenzip_path = find_7zip() if args.use_7zip else None
+        if args.use_7zip and not sevenzip_path:
+            parser.error("找不到 7-Zip")
+        estimate = estimate_batch(args.estimate, sevenzip_path=sevenzip_path, workers=args.workers)
+        print(estimate.format())
+        if not estimate.fits:
+            sys.exit(1)
+        return
+
+    if args.stream:
+        is_stream = args.output == '-' or args.output.startswith(('unix:', 'http://', 'https://'))
+        if args.manifest and is_stream:
+            parser.error("校驗清單需要輸出到本機檔案")
+
+        sink = open_sink(args.output)
+        if sink is not None:
+            with sink:
+                write_builtin_zip(args.stream, sink, compact=args.compact)
+        elif args.manifest:
+            hasher = ManifestHasher(args.manifest)
+            try:
+                write_builtin_zip(args.stream, args.output, compact=args.compact, hasher=hasher)
+            except BaseException:
+                hasher.abort()
+                raise
+            with hasher.close() as entries:
+                write_manifest(args.output, entries, args.manifest)
+        else:
+            write_builtin_zip(args.stream, args.output, compact=args.compact)
+        return
+
     # Use TkinterDnD if available, otherwise regular Tk
     if HAS_DND:
         root = TkinterDnD.Tk()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: folder walking and builtin zipping on a synthetic small-file tree
+
+Compares the old Path.rglob based walk with iter_folder_files, and optionally
+times a full builtin archive of the tree.
+
+Usage:
+    python benchmarks/bench_walk.py                    # 1,000,000 files in a temp dir
+    python benchmarks/bench_walk.py --files 100000     # smaller tree
+    python benchmarks/bench_walk.py --root /tmp/tree   # reuse/keep a tree
+    python benchmarks/bench_walk.py --zip              # also time a full archive
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from batch_zip_gui import iter_folder_files, write_builtin_zip  # noqa: E402
+
+
+def build_tree(root, files, files_per_dir, file_size):
+    """Create `files` files of `file_size` bytes, `files_per_dir` per directory"""
+    marker = root / '.complete'
+    if marker.exists() and marker.read_text() == f"{files}/{files_per_dir}/{file_size}":
+        return
+    payload = os.urandom(file_size // 2) + b'a' * (file_size - file_size // 2)
+    tree = root / 'tree'
+    for i in range(files):
+        if i % files_per_dir == 0:
+            current = tree / f"d{i // (files_per_dir * 100):04d}" / f"s{i // files_per_dir:06d}"
+            current.mkdir(parents=True, exist_ok=True)
+        with open(current / f"f{i:07d}.dat", 'wb') as f:
+            f.write(payload)
+    marker.write_text(f"{files}/{files_per_dir}/{file_size}")
+
+
+def walk_rglob(folder):
+    """The walk _zip_with_builtin used to do"""
+    count = 0
+    for file_path in folder.rglob('*'):
+        if file_path.is_file():
+            file_path.relative_to(folder.parent)
+            count += 1
+    return count
+
+
+def walk_scandir(folder):
+    count = 0
+    for batch in iter_folder_files(folder):
+        count += len(batch)
+    return count
+
+
+def timed(label, func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<28} {elapsed:8.2f} s  ({result} files)")
+    return elapsed
+
+
+def zip_tree(folder, output_path):
+    write_builtin_zip(folder, output_path)
+    return sum(len(batch) for batch in iter_folder_files(folder))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--files', type=int, default=1_000_000, help='number of files (default: 1,000,000)')
+    parser.add_argument('--files-per-dir', type=int, default=1000, help='files per directory (default: 1000)')
+    parser.add_argument('--file-size', type=int, default=64, help='bytes per file (default: 64)')
+    parser.add_argument('--root', help='directory to build the tree in (kept afterwards)')
+    parser.add_argument('--zip', action='store_true', help='also time a full builtin archive')
+    args = parser.parse_args()
+
+    root = Path(args.root) if args.root else Path(tempfile.mkdtemp(prefix='batch-zip-bench-'))
+    root.mkdir(parents=True, exist_ok=True)
+    try:
+        print(f"Building {args.files} files in {root} ...")
+        start = time.perf_counter()
+        build_tree(root, args.files, args.files_per_dir, args.file_size)
+        print(f"Tree ready in {time.perf_counter() - start:.1f} s\n")
+
+        folder = root / 'tree'
+        # Warm the dentry/inode cache so both walks see the same conditions
+        walk_scandir(folder)
+
+        old = timed('Path.rglob + is_file', walk_rglob, folder)
+        new = timed('iter_folder_files', walk_scandir, folder)
+        print(f"{'speedup':<28} {old / new:8.2f} x")
+
+        if args.zip:
+            output_path = root / 'tree.zip'
+            timed('builtin zip', zip_tree, folder, output_path)
+            print(f"{'archive size':<28} {output_path.stat().st_size / 1024 / 1024:8.1f} MB")
+            output_path.unlink()
+    finally:
+        if not args.root:
+            shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
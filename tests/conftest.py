@@ -0,0 +1,26 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+@pytest.fixture
+def source_folder(tmp_path):
+    """Small folder with nested, empty, compressible, random and non-ASCII files"""
+    folder = tmp_path / 'source'
+    (folder / 'sub' / 'deeper').mkdir(parents=True)
+    (folder / 'a.txt').write_bytes(b'hello world\n' * 5000)
+    (folder / 'sub' / 'random.bin').write_bytes(bytes(range(256)) * 1024 + b'\x00')
+    (folder / 'sub' / 'deeper' / 'empty.dat').write_bytes(b'')
+    (folder / 'sub' / '中文檔案.txt').write_bytes('壓縮測試\n'.encode('utf-8') * 2000)
+    return folder
+
+
+def folder_contents(folder):
+    """{arcname: bytes} the way write_builtin_zip names the members"""
+    return {
+        path.relative_to(folder.parent).as_posix(): path.read_bytes()
+        for path in folder.rglob('*') if path.is_file()
+    }
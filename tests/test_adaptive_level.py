@@ -0,0 +1,143 @@
+import threading
+import time
+
+import pytest
+
+from batch_zip_gui import (
+    ADAPTIVE_WINDOW_BYTES, BUILTIN_LEVEL, BUILTIN_LEVELS, AdaptiveLevelController, Job,
+    parse_adaptive_target,
+)
+
+MB = 1024 * 1024
+
+
+def deadline_controller(seconds_left=1000):
+    return AdaptiveLevelController(BUILTIN_LEVELS, BUILTIN_LEVEL, deadline=time.time() + seconds_left)
+
+
+def fill_window(controller, key, rate, ratio=0.5):
+    """Record one full window for a key at its current level and return the new level"""
+    level = controller.level(key)
+    controller.record(key, level, ADAPTIVE_WINDOW_BYTES, int(ADAPTIVE_WINDOW_BYTES * ratio),
+                      ADAPTIVE_WINDOW_BYTES / rate)
+    return controller.level(key)
+
+
+def test_parse_adaptive_target():
+    assert parse_adaptive_target("50") == (50 * MB, None)
+    now = time.mktime((2026, 1, 1, 12, 0, 0, 0, 0, -1))
+    assert parse_adaptive_target("13:30", now)[1] - now == 90 * 60
+    # Already passed today: tomorrow
+    assert parse_adaptive_target("06:00", now)[1] - now == 18 * 60 * 60
+    with pytest.raises(ValueError):
+        parse_adaptive_target("25:00")
+
+
+def test_deadline_counts_queued_minus_compressed():
+    controller = deadline_controller()
+    job = Job('/data/a')
+    controller.add_work(100 * MB, job)
+    controller.start_work(job)
+    controller.record('.txt', BUILTIN_LEVEL, 30 * MB, 10 * MB, 1.0)
+    assert controller.remaining_bytes == 70 * MB
+    controller.finish_work(job)
+    assert controller.remaining_bytes == 0
+    assert controller.queued_bytes == controller.done_bytes == 0
+
+
+def test_deadline_records_before_the_size_walk_are_not_lost():
+    controller = deadline_controller()
+    job = Job('/data/a')
+    controller.start_work(job)
+    # The job compresses files before the background walk has measured it
+    controller.record('.txt', BUILTIN_LEVEL, 40 * MB, 10 * MB, 1.0)
+    assert controller.remaining_bytes == 0
+    controller.add_work(100 * MB, job)
+    assert controller.remaining_bytes == 60 * MB
+
+
+@pytest.mark.parametrize('outcome', ['skipped', 'failed', 'cancelled'])
+def test_deadline_drops_jobs_that_are_never_compressed(outcome):
+    controller = deadline_controller()
+    jobs = [Job(f'/data/{n}') for n in range(3)]
+    for job in jobs:
+        controller.add_work(100 * MB, job)
+    assert controller.remaining_bytes == 300 * MB
+    rate_before = controller.target_rate()
+
+    job = jobs[0]
+    if outcome == 'failed':
+        controller.start_work(job)
+        controller.record('.txt', BUILTIN_LEVEL, 20 * MB, 5 * MB, 1.0)
+    elif outcome == 'skipped':
+        controller.start_work(job)
+    controller.finish_work(job)
+
+    assert controller.remaining_bytes == 200 * MB
+    assert controller.target_rate() < rate_before
+    # A size walk that finishes after the job is ignored
+    controller.add_work(100 * MB, job)
+    assert controller.remaining_bytes == 200 * MB
+
+
+def test_records_are_attributed_per_worker_thread():
+    controller = deadline_controller()
+    jobs = [Job('/data/a'), Job('/data/b')]
+    for job in jobs:
+        controller.add_work(50 * MB, job)
+
+    def work(job):
+        controller.start_work(job)
+        controller.record('.txt', BUILTIN_LEVEL, 10 * MB, 5 * MB, 1.0)
+
+    threads = [threading.Thread(target=work, args=(job,)) for job in jobs]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert controller.remaining_bytes == 80 * MB
+    controller.finish_work(jobs[0])
+    assert controller.remaining_bytes == 40 * MB
+
+
+def test_level_steps_down_when_slow_and_up_when_fast():
+    controller = AdaptiveLevelController(BUILTIN_LEVELS, BUILTIN_LEVEL, rate=100 * MB)
+    assert fill_window(controller, '.txt', rate=50 * MB, ratio=0.40) == BUILTIN_LEVEL - 1
+    assert fill_window(controller, '.txt', rate=50 * MB, ratio=0.45) == BUILTIN_LEVEL - 2
+    # On target: stays
+    assert fill_window(controller, '.txt', rate=100 * MB, ratio=0.50) == BUILTIN_LEVEL - 2
+    assert fill_window(controller, '.txt', rate=200 * MB, ratio=0.50) == BUILTIN_LEVEL - 1
+    # Other types keep their own level
+    assert controller.level('.log') == BUILTIN_LEVEL
+
+
+def test_level_does_not_step_up_to_a_level_known_to_compress_worse():
+    controller = AdaptiveLevelController(BUILTIN_LEVELS, BUILTIN_LEVEL, rate=100 * MB)
+    assert fill_window(controller, '.txt', rate=50 * MB, ratio=0.5) == BUILTIN_LEVEL - 1
+    assert fill_window(controller, '.txt', rate=200 * MB, ratio=0.5) == BUILTIN_LEVEL - 1
+
+
+def test_partial_window_and_stale_level_do_not_move():
+    controller = AdaptiveLevelController(BUILTIN_LEVELS, BUILTIN_LEVEL, rate=100 * MB)
+    controller.record('.txt', BUILTIN_LEVEL, ADAPTIVE_WINDOW_BYTES // 2, 1, 10.0)
+    assert controller.level('.txt') == BUILTIN_LEVEL
+    controller.record('.txt', 9, ADAPTIVE_WINDOW_BYTES, 1, 10.0)
+    assert controller.level('.txt') == BUILTIN_LEVEL
+
+
+def test_incompressible_type_is_stored():
+    controller = AdaptiveLevelController(BUILTIN_LEVELS, BUILTIN_LEVEL, rate=100 * MB)
+    assert fill_window(controller, '.jpg', rate=100 * MB, ratio=0.99) == 0
+
+
+def test_stores_compressible_type_only_as_a_last_resort():
+    controller = AdaptiveLevelController(BUILTIN_LEVELS, 1, rate=100 * MB)
+    assert fill_window(controller, '.txt', rate=80 * MB) == 1
+    assert fill_window(controller, '.txt', rate=40 * MB) == 0
+
+
+def test_deadline_passed_forces_fastest():
+    controller = deadline_controller(seconds_left=-1)
+    controller.add_work(MB, Job('/data/a'))
+    assert controller.target_rate() == float('inf')
+    assert fill_window(controller, '.txt', rate=500 * MB) == BUILTIN_LEVEL - 1
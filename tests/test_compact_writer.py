@@ -0,0 +1,53 @@
+import zipfile
+import zlib
+
+import pytest
+
+from batch_zip_gui import ZIP64_COUNT_LIMIT, CompactZipWriter, iter_folder_files
+
+# More entries than a ZIP without ZIP64 end records can count
+ENTRY_COUNT = ZIP64_COUNT_LIMIT + 4465
+
+
+@pytest.fixture(scope='module')
+def many_files(tmp_path_factory):
+    """Folder with ENTRY_COUNT files, a third of them under non-ASCII names"""
+    folder = tmp_path_factory.mktemp('compact') / '大量檔案'
+    for i in range(ENTRY_COUNT):
+        if i % 1000 == 0:
+            current = folder / f"目錄_{i // 1000:03d}"
+            current.mkdir(parents=True)
+        name = f"檔案_{i:06d}.txt" if i % 3 == 0 else f"file_{i:06d}.txt"
+        (current / name).write_bytes(b"line %d\n" % i * (i % 7))
+    (folder / 'compressible_ünïcödé.log').write_bytes(b'same line again\n' * 20000)
+    return folder
+
+
+@pytest.mark.parametrize('stored_every', [None, 1000], ids=['deflate-only', 'with-stored'])
+def test_compact_writer_zip64_entry_count(many_files, tmp_path, stored_every):
+    output = tmp_path / 'out.zip'
+    expected = {}
+    stored = set()
+    with CompactZipWriter(str(output)) as writer:
+        for batch in iter_folder_files(many_files):
+            for file_path, arcname, st in batch:
+                level = None
+                if stored_every and len(expected) % stored_every == 0:
+                    level = 0
+                    stored.add(arcname)
+                writer.write_file(file_path, arcname, st, level)
+                with open(file_path, 'rb') as f:
+                    data = f.read()
+                expected[arcname] = (len(data), zlib.crc32(data))
+    assert len(expected) == ENTRY_COUNT + 1
+    assert bool(stored) == bool(stored_every)
+
+    with zipfile.ZipFile(output) as zipf:
+        assert zipf.testzip() is None
+        infos = zipf.infolist()
+        assert len(infos) == len(expected)
+        assert {info.filename: (info.file_size, info.CRC) for info in infos} == expected
+        for info in infos:
+            expected_type = zipfile.ZIP_STORED if info.filename in stored else zipfile.ZIP_DEFLATED
+            assert info.compress_type == expected_type
+        assert zipf.read(f"{many_files.name}/compressible_ünïcödé.log") == b'same line again\n' * 20000
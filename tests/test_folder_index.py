@@ -0,0 +1,132 @@
+import json
+import multiprocessing
+import os
+
+import pytest
+
+from batch_zip_gui import FolderIndex, folder_fingerprint
+
+
+@pytest.fixture
+def archived(tmp_path):
+    """Two folders, each with an archive next to it"""
+    folders = []
+    for name in ('one', 'two'):
+        folder = tmp_path / name
+        folder.mkdir()
+        (folder / 'data.txt').write_text(name)
+        archive = tmp_path / f"{name}.zip"
+        archive.write_bytes(b'archive ' + name.encode())
+        folders.append((folder, archive))
+    return folders
+
+
+def read_index(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_concurrent_instances_keep_each_others_entries(tmp_path, archived):
+    index_path = tmp_path / 'index' / 'index.json'
+    (one, one_zip), (two, two_zip) = archived
+    first = FolderIndex(index_path)
+    second = FolderIndex(index_path)
+
+    first.record(one, folder_fingerprint(one), one_zip)
+    second.record(two, folder_fingerprint(two), two_zip)
+    first.flush()
+    second.flush()
+
+    assert len(read_index(index_path)) == 2
+    reloaded = FolderIndex(index_path)
+    assert reloaded.is_unchanged(one, folder_fingerprint(one), one_zip)
+    assert reloaded.is_unchanged(two, folder_fingerprint(two), two_zip)
+    # A flush also picks up what other instances wrote
+    assert second.is_unchanged(one, folder_fingerprint(one), one_zip)
+
+
+def test_forget_removes_only_its_entry(tmp_path, archived):
+    index_path = tmp_path / 'index.json'
+    (one, one_zip), (two, two_zip) = archived
+    first = FolderIndex(index_path)
+    first.record(one, folder_fingerprint(one), one_zip)
+    first.flush()
+    second = FolderIndex(index_path)
+    second.record(two, folder_fingerprint(two), two_zip)
+    first.forget(one)
+    first.flush()
+    second.flush()
+    assert list(read_index(index_path)) == [FolderIndex._key(two)]
+
+
+def test_changes_are_batched_until_flush(tmp_path, archived):
+    index_path = tmp_path / 'index.json'
+    (one, one_zip), _ = archived
+    index = FolderIndex(index_path)
+    index.record(one, folder_fingerprint(one), one_zip)
+    assert not index_path.exists()
+    # Visible to this instance straight away
+    assert index.is_unchanged(one, folder_fingerprint(one), one_zip)
+    index.flush()
+    assert len(read_index(index_path)) == 1
+
+
+def test_is_unchanged_follows_archive_and_folder(tmp_path, archived):
+    index = FolderIndex(tmp_path / 'index.json')
+    (one, one_zip), (two, two_zip) = archived
+    index.record(one, folder_fingerprint(one), one_zip)
+    index.record(two, folder_fingerprint(two), two_zip)
+    assert index.is_unchanged(one, folder_fingerprint(one), one_zip)
+
+    # Archive touched: same size, new mtime
+    st = one_zip.stat()
+    os.utime(one_zip, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert not index.is_unchanged(one, folder_fingerprint(one), one_zip)
+
+    # Archive rewritten with a different size, mtime kept
+    st = two_zip.stat()
+    two_zip.write_bytes(b'a longer archive than before')
+    os.utime(two_zip, ns=(st.st_atime_ns, st.st_mtime_ns))
+    assert not index.is_unchanged(two, folder_fingerprint(two), two_zip)
+
+    # Folder contents changed, archive untouched
+    index.record(two, folder_fingerprint(two), two_zip)
+    (two / 'new.txt').write_text('new')
+    assert not index.is_unchanged(two, folder_fingerprint(two), two_zip)
+
+    one_zip.unlink()
+    assert not index.is_unchanged(one, folder_fingerprint(one), one_zip)
+
+
+def test_fingerprint_ignores_walk_order_but_not_metadata(tmp_path):
+    folder = tmp_path / 'f'
+    (folder / 'sub').mkdir(parents=True)
+    (folder / 'a').write_text('a')
+    (folder / 'sub' / 'b').write_text('b')
+    before = folder_fingerprint(folder)
+    assert before == folder_fingerprint(folder)
+    assert before.startswith('2:')
+    (folder / 'a').write_text('aa')
+    assert folder_fingerprint(folder) != before
+
+
+def _record_many(index_path, archive_path, worker):
+    index = FolderIndex(index_path)
+    for n in range(50):
+        index.record(f"/data/{worker}/{n}", f"fp{n}", archive_path)
+    index.flush()
+
+
+def test_processes_flushing_at_once_lose_nothing(tmp_path, archived):
+    index_path = tmp_path / 'index.json'
+    archive = archived[0][1]
+    processes = [
+        multiprocessing.Process(target=_record_many, args=(str(index_path), str(archive), worker))
+        for worker in range(4)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(30)
+        assert process.exitcode == 0
+    assert len(read_index(index_path)) == 200
@@ -0,0 +1,130 @@
+import threading
+import time
+
+from batch_zip_gui import Job, JobQueue
+
+
+def open_queue(*priorities):
+    job_queue = JobQueue()
+    job_queue.open()
+    jobs = []
+    for n, priority in enumerate(priorities):
+        job = Job(f'/data/{n}')
+        assert job_queue.put(job, priority)
+        jobs.append(job)
+    return job_queue, jobs
+
+
+def drain(job_queue):
+    order = []
+    while True:
+        job = job_queue.get()
+        if job is None:
+            return order
+        order.append(job)
+        job_queue.task_done(job, 'done')
+
+
+def test_put_on_closed_queue_is_refused():
+    job_queue = JobQueue()
+    assert not job_queue.put(Job('/data/a'), 0)
+
+
+def test_lower_priority_runs_first_then_fifo():
+    job_queue, jobs = open_queue(2, 0, 1, 0)
+    assert drain(job_queue) == [jobs[1], jobs[3], jobs[2], jobs[0]]
+    assert job_queue.closed
+    assert all(job.state == 'done' for job in jobs)
+
+
+def test_reprioritize_moves_pending_job():
+    job_queue, jobs = open_queue(0, 1, 2)
+    job_queue.reprioritize(jobs[2], -1)
+    assert job_queue.pending == 3
+    assert drain(job_queue) == [jobs[2], jobs[0], jobs[1]]
+
+
+def test_reprioritize_ignores_running_job():
+    job_queue, jobs = open_queue(0, 1)
+    running = job_queue.get()
+    job_queue.reprioritize(running, 5)
+    assert running.priority == 0
+    job_queue.task_done(running, 'done')
+    assert drain(job_queue) == [jobs[1]]
+
+
+def test_cancel_only_pending_jobs():
+    job_queue, jobs = open_queue(0, 1, 2)
+    assert job_queue.cancel(jobs[1])
+    assert not job_queue.cancel(jobs[1])
+    running = job_queue.get()
+    assert running is jobs[0]
+    assert not job_queue.cancel(running)
+    assert running.state == 'running'
+    job_queue.task_done(running, 'done')
+    assert drain(job_queue) == [jobs[2]]
+    assert jobs[1].state == 'cancelled'
+
+
+def test_get_waits_for_running_jobs_with_several_workers():
+    job_queue, jobs = open_queue(0)
+    first = job_queue.get()
+    results = []
+
+    def idle_worker():
+        results.append(job_queue.get())
+
+    worker = threading.Thread(target=idle_worker, daemon=True)
+    worker.start()
+    time.sleep(0.1)
+    # Nothing pending, but a job is still running: the run is not over
+    assert worker.is_alive()
+    assert not job_queue.closed
+
+    # The running job's worker adds a late job; the idle worker picks it up
+    late = Job('/data/late')
+    assert job_queue.put(late, 0)
+    worker.join(5)
+    assert results == [late]
+
+    job_queue.task_done(first, 'done')
+    worker = threading.Thread(target=idle_worker, daemon=True)
+    worker.start()
+    time.sleep(0.1)
+    assert worker.is_alive()
+    job_queue.task_done(late, 'failed')
+    worker.join(5)
+    assert results == [late, None]
+    assert job_queue.closed
+    assert not job_queue.put(Job('/data/too-late'), 0)
+
+
+def test_cancelling_last_pending_job_ends_waiting_workers():
+    job_queue, jobs = open_queue(0, 1)
+    running = job_queue.get()
+    job_queue.cancel(jobs[1])
+    job_queue.task_done(running, 'done')
+    assert job_queue.get() is None
+
+
+def test_every_job_runs_once_across_workers():
+    job_queue, jobs = open_queue(*range(200))
+    taken = []
+    lock = threading.Lock()
+
+    def worker():
+        while True:
+            job = job_queue.get()
+            if job is None:
+                return
+            with lock:
+                taken.append(job)
+            job_queue.task_done(job, 'done')
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert sorted(taken, key=jobs.index) == jobs
+    assert job_queue.pending == job_queue.running == 0
@@ -0,0 +1,86 @@
+import hashlib
+import json
+import zipfile
+
+import pytest
+
+from batch_zip_gui import (
+    ManifestEntries, ManifestHasher, hash_folder_manifest, manifest_path, write_builtin_zip,
+    write_manifest,
+)
+from conftest import folder_contents
+
+
+def expected_digests(folder, algorithm):
+    return {name: hashlib.new(algorithm, data).hexdigest() for name, data in folder_contents(folder).items()}
+
+
+def read_text_manifest(path):
+    digests = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            digest, name = line.rstrip('\n').split('  ', 1)
+            digests[name] = digest
+    return digests
+
+
+@pytest.mark.parametrize('compact', [False, True], ids=['zipfile', 'compact'])
+@pytest.mark.parametrize('algorithm', ['sha256', 'blake2b'])
+def test_manifest_written_while_zipping(source_folder, tmp_path, compact, algorithm):
+    archive = tmp_path / 'source.zip'
+    hasher = ManifestHasher(algorithm)
+    write_builtin_zip(source_folder, str(archive), compact=compact, hasher=hasher)
+    with hasher.close() as entries:
+        assert len(entries) == len(folder_contents(source_folder))
+        text_path = write_manifest(str(archive), entries, algorithm)
+        json_path = write_manifest(str(archive), entries, algorithm, as_json=True)
+
+    expected = expected_digests(source_folder, algorithm)
+    assert text_path == manifest_path(str(archive), algorithm)
+    assert read_text_manifest(text_path) == expected
+
+    with open(json_path, encoding='utf-8') as f:
+        document = json.load(f)
+    assert document == {'archive': 'source.zip', 'algorithm': algorithm, 'files': expected}
+
+    with zipfile.ZipFile(archive) as zipf:
+        assert zipf.testzip() is None
+        assert set(zipf.namelist()) == set(expected)
+
+
+def test_manifest_from_disk_matches(source_folder, tmp_path):
+    archive = tmp_path / 'source.zip'
+    path = hash_folder_manifest(source_folder, str(archive), 'sha256', as_json=True)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['files'] == expected_digests(source_folder, 'sha256')
+
+
+def test_empty_manifest_json_parses(tmp_path):
+    with ManifestEntries() as entries:
+        path = write_manifest(str(tmp_path / 'empty.zip'), entries, 'sha256', as_json=True)
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['files'] == {}
+
+
+def test_entries_keep_walk_order_and_spill_to_disk(monkeypatch):
+    monkeypatch.setattr('batch_zip_gui.MANIFEST_ENTRIES_IN_MEMORY', 1024)
+    pairs = [(f"目錄/檔案_{n:05d}.txt", f"{n:064x}") for n in range(5000, 0, -1)]
+    with ManifestEntries() as entries:
+        for name, digest in pairs:
+            entries.append(name, digest)
+        assert entries._file._rolled
+        assert list(entries) == pairs
+        # Iterating twice gives the same records
+        assert list(entries) == pairs
+
+
+def test_hasher_error_is_raised_on_close_but_not_on_abort():
+    hasher = ManifestHasher('sha256')
+    hasher._error = ValueError("hash failed")
+    # The error path must not replace the archive's own exception
+    hasher.abort()
+
+    hasher = ManifestHasher('sha256')
+    hasher._error = ValueError("hash failed")
+    with pytest.raises(ValueError):
+        hasher.close()
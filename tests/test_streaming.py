@@ -0,0 +1,143 @@
+import io
+import os
+import socket
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from batch_zip_gui import FileObjectSink, HttpPutSink, UnixSocketSink, write_builtin_zip
+from conftest import folder_contents
+
+
+def assert_archive_matches(data, folder):
+    with zipfile.ZipFile(io.BytesIO(data)) as zipf:
+        assert zipf.testzip() is None
+        assert {name: zipf.read(name) for name in zipf.namelist()} == folder_contents(folder)
+
+
+class PutReceiver:
+    """HTTP server on a thread that decodes chunked PUT bodies"""
+
+    def __init__(self):
+        self.body = bytearray()
+        self.complete = False
+        self.done = threading.Event()
+        receiver = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_PUT(self):
+                try:
+                    assert self.headers['Transfer-Encoding'] == 'chunked'
+                    while True:
+                        line = self.rfile.readline()
+                        if not line:
+                            return
+                        size = int(line.split(b';')[0], 16)
+                        if size == 0:
+                            self.rfile.readline()
+                            break
+                        chunk = self.rfile.read(size)
+                        if len(chunk) < size:
+                            return
+                        receiver.body += chunk
+                        self.rfile.readline()
+                    receiver.complete = True
+                    self.send_response(201)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                finally:
+                    receiver.done.set()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = HTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}/upload/folder.zip"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def put_receiver():
+    receiver = PutReceiver()
+    yield receiver
+    receiver.stop()
+
+
+def test_http_put_sink(source_folder, put_receiver):
+    with HttpPutSink(put_receiver.url) as sink:
+        write_builtin_zip(source_folder, sink)
+
+    assert put_receiver.done.wait(10)
+    assert put_receiver.complete
+    assert_archive_matches(bytes(put_receiver.body), source_folder)
+
+
+def test_http_put_sink_aborts_on_error(source_folder, put_receiver):
+    with pytest.raises(RuntimeError):
+        with HttpPutSink(put_receiver.url) as sink:
+            write_builtin_zip(source_folder, sink)
+            sink.flush()
+            raise RuntimeError("failed after the archive was written")
+
+    assert put_receiver.done.wait(10)
+    # The connection was dropped before the terminating chunk
+    assert not put_receiver.complete
+
+
+@pytest.mark.skipif(not hasattr(socket, 'AF_UNIX'), reason="no Unix domain sockets")
+def test_unix_socket_sink(source_folder, tmp_path):
+    path = str(tmp_path / 'zip.sock')
+    listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    listener.bind(path)
+    listener.listen(1)
+    received = bytearray()
+
+    def accept():
+        conn, _ = listener.accept()
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    break
+                received.extend(data)
+
+    thread = threading.Thread(target=accept, daemon=True)
+    thread.start()
+    try:
+        with UnixSocketSink(path) as sink:
+            write_builtin_zip(source_folder, sink)
+        thread.join(10)
+        assert not thread.is_alive()
+    finally:
+        listener.close()
+
+    assert_archive_matches(bytes(received), source_folder)
+
+
+def test_file_object_sink_through_pipe(source_folder):
+    read_fd, write_fd = os.pipe()
+    received = bytearray()
+
+    def drain():
+        with os.fdopen(read_fd, 'rb') as pipe:
+            while True:
+                data = pipe.read(65536)
+                if not data:
+                    break
+                received.extend(data)
+
+    thread = threading.Thread(target=drain, daemon=True)
+    thread.start()
+    with FileObjectSink(os.fdopen(write_fd, 'wb'), close_fileobj=True) as sink:
+        write_builtin_zip(source_folder, sink)
+    thread.join(10)
+    assert not thread.is_alive()
+
+    assert_archive_matches(bytes(received), source_folder)